@@ -3,8 +3,10 @@ Web Dashboard for TradeGo - Real-time monitoring and control
 """
 
 from flask import Flask, render_template, jsonify, request
-from datetime import datetime, date
+from datetime import datetime, date, time as dt_time
+from zoneinfo import ZoneInfo
 import json
+import time
 import subprocess
 import psutil
 import signal
@@ -26,6 +28,42 @@ upstox_integration = get_upstox_integration()
 # Trading system process
 trading_process = None
 
+# Last known Upstox balance, reused outside market hours
+IST = ZoneInfo('Asia/Kolkata')
+OFF_HOURS_BALANCE_TTL = 300  # Refresh at most every 5 minutes when market is closed
+_live_balance_cache = {'value': None, 'fetched_at': 0.0}
+
+
+def is_market_hours() -> bool:
+    """Check if current IST time is within trading hours (with pre-open/post-close margin)"""
+    now = datetime.now(IST)
+    return now.weekday() < 5 and dt_time(9, 0) <= now.time() <= dt_time(15, 45)
+
+
+def get_live_balance():
+    """
+    Get available margin from Upstox.
+    Outside market hours the last known value is returned and only
+    refreshed every OFF_HOURS_BALANCE_TTL seconds.
+    """
+    cached = _live_balance_cache['value']
+    age = time.monotonic() - _live_balance_cache['fetched_at']
+    if cached is not None and not is_market_hours() and age < OFF_HOURS_BALANCE_TTL:
+        return cached
+
+    try:
+        operator = upstox_integration.get_operator()
+        if operator:
+            funds = operator.get_funds()
+            if funds.get('status') == 'ok':
+                _live_balance_cache['value'] = funds.get('equity', {}).get('available_margin', 0)
+                _live_balance_cache['fetched_at'] = time.monotonic()
+                return _live_balance_cache['value']
+    except Exception as e:
+        logger.error(f"Error fetching live balance: {e}")
+
+    return cached
+
 
 def is_trading_system_running() -> bool:
     """Check if orchestrator is running"""
@@ -165,14 +203,7 @@ def api_status():
         # Get live balance if in LIVE mode with REAL money
         live_balance = None
         if settings['mode'] == 'LIVE' and settings['live_type'] == 'REAL':
-            try:
-                operator = upstox_integration.get_operator()
-                if operator:
-                    funds = operator.get_funds()
-                    if funds.get('status') == 'ok':
-                        live_balance = funds.get('equity', {}).get('available_margin', 0)
-            except Exception as e:
-                logger.error(f"Error fetching live balance: {e}")
+            live_balance = get_live_balance()
 
         capital = live_balance if live_balance else settings['capital']
 
@@ -276,25 +307,26 @@ def api_closed_trades():
     """Get recent closed trades"""
     try:
         days = request.args.get('days', default=7, type=int)
-        trades = pnl_engine.get_trades(days=days)
+        # Raw rows: timestamps are already stored as ISO strings
+        rows = pnl_engine.get_trades_raw(days=days)
 
         trades_data = []
-        for trade in trades:
+        for row in rows:
             trades_data.append({
-                'trade_id': trade.trade_id,
-                'symbol': trade.symbol,
-                'strategy': trade.strategy,
-                'direction': trade.direction,
-                'quantity': trade.quantity,
-                'entry_price': trade.entry_price,
-                'exit_price': trade.exit_price,
-                'entry_time': trade.entry_time.isoformat(),
-                'exit_time': trade.exit_time.isoformat() if trade.exit_time else None,
-                'exit_reason': trade.exit_reason,
-                'net_pnl': trade.net_pnl,
-                'pnl_percent': trade.pnl_percent,
-                'product': trade.product,
-                'holding_minutes': trade.holding_minutes
+                'trade_id': row['trade_id'],
+                'symbol': row['symbol'],
+                'strategy': row['strategy'],
+                'direction': row['direction'],
+                'quantity': row['quantity'],
+                'entry_price': row['entry_price'],
+                'exit_price': row['exit_price'],
+                'entry_time': row['entry_time'],
+                'exit_time': row['exit_time'],
+                'exit_reason': row['exit_reason'],
+                'net_pnl': row['net_pnl'],
+                'pnl_percent': row['pnl_percent'],
+                'product': row['product'],
+                'holding_minutes': row['holding_minutes']
             })
 
         return jsonify({
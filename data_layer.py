@@ -4,6 +4,7 @@ Handles: Market data, Technical indicators, News, Watchlist management
 """
 
 import re
+import sys
 import time
 import logging
 from datetime import datetime, timedelta
@@ -12,16 +13,64 @@ from dataclasses import dataclass
 import pandas as pd
 import numpy as np
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from bs4 import BeautifulSoup
 
+# JIT-compiled RSI kernel (optional, falls back to numpy)
+try:
+    import numba
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 # Import existing modules
-from upstox_technical import UpstoxTechnicalClient
+from upstox_technical import UpstoxTechnicalClient, shared_session
 from news_client import NewsClient
 
 logger = logging.getLogger(__name__)
 
 
+def _rsi_last_loop(close: np.ndarray, period: int) -> float:
+    """
+    Latest RSI from simple `period`-bar averages of gains and losses,
+    matching the pandas diff/where/rolling(period).mean() formulation (NaN if undefined)
+    """
+    n = len(close)
+    if n < period:
+        return np.nan
+    gain = 0.0
+    loss = 0.0
+    # The first bar has no delta and counts as 0, as in the pandas version
+    for i in range(max(1, n - period), n):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain += d
+        elif d < 0:
+            loss -= d
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else np.nan
+    rs = (gain / period) / (loss / period)
+    return 100.0 - 100.0 / (1.0 + rs)
+
+
+def _rsi_last_numpy(close: np.ndarray, period: int) -> float:
+    """Array equivalent of _rsi_last_loop"""
+    n = len(close)
+    if n < period:
+        return np.nan
+    delta = np.diff(close[max(0, n - period - 1):])
+    gain = delta[delta > 0].sum()
+    loss = -delta[delta < 0].sum()
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else np.nan
+    rs = (gain / period) / (loss / period)
+    return 100.0 - 100.0 / (1.0 + rs)
+
+
+_rsi_last = numba.njit(cache=True)(_rsi_last_loop) if _HAS_NUMBA else _rsi_last_numpy
+
+
 @dataclass
 class NewsItem:
     """News article data"""
@@ -32,7 +81,7 @@ class NewsItem:
     symbol: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Signal:
     """Trading signal"""
     symbol: str
@@ -46,6 +95,32 @@ class Signal:
     news_score: float = 0.0
     tech_score: float = 0.0
 
+    def __post_init__(self):
+        # Symbols key sector/LTP/cache dicts downstream; interned keys compare by identity
+        self.symbol = sys.intern(self.symbol)
+
+
+@dataclass(slots=True)
+class IndicatorSnapshot:
+    """Latest technical indicator values for one OHLCV frame (defaults where not computed)"""
+    close: float = 0.0
+    sma_20: float = 0.0
+    sma_50: float = 0.0
+    ema_9: float = 0.0
+    ema_21: float = 0.0
+    rsi: float = 50.0
+    macd: float = 0.0
+    macd_signal: float = 0.0
+    macd_hist: float = 0.0
+    atr: float = 0.0
+    vwap: float = 0.0
+    bb_upper: float = 0.0
+    bb_middle: float = 0.0
+    bb_lower: float = 0.0
+    adx: float = float('nan')  # Unknown trend strength: fails both "> 25" and "< 20"
+    volume_sma: float = 0.0
+    arrays: Optional[Dict[str, np.ndarray]] = None  # close/high/low/volume as float arrays
+
 
 class DataLayer:
     """Unified data layer for market data, news, and watchlist management"""
@@ -99,12 +174,18 @@ class DataLayer:
         'bearish': -0.20, 'negative': -0.10, 'warning': -0.15, 'risk': -0.10
     }
 
+    # Memoized indicator sets kept before the cache is reset
+    INDICATOR_CACHE_SIZE = 512
+
     def __init__(self):
-        self.upstox_client = UpstoxTechnicalClient()
-        self.news_client = NewsClient()
+        # Both clients share the process-wide connection pool (OHLCV and news fetches run 8 threads wide)
+        session = shared_session()
+        self.upstox_client = UpstoxTechnicalClient(session=session)
+        self.news_client = NewsClient(session=session)
         self._symbol_cache = {}  # Cache for symbol resolution
         self._ohlcv_cache = {}   # Cache for OHLCV data
         self._news_cache = {}     # Cache for news
+        self._indicator_cache = {}  # id(ohlcv) -> (ohlcv, indicators, macd histogram)
 
         # Load settings to check mode
         try:
@@ -403,6 +484,19 @@ class DataLayer:
             logger.error(f"Error fetching OHLCV for {symbol}: {e}")
             return None
 
+    def get_ohlcv_batch(self, symbols: List[str], interval: str, bars: int) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Get OHLCV data for several symbols, fetching concurrently (IO-bound, independent calls)
+        Returns {symbol: DataFrame or None}; cached symbols return without a round-trip
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if len(symbols) <= 1:
+            return {symbol: self.get_ohlcv(symbol, interval, bars) for symbol in symbols}
+
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as pool:
+            frames = pool.map(lambda symbol: self.get_ohlcv(symbol, interval, bars), symbols)
+            return dict(zip(symbols, frames))
+
     def _validate_ohlcv(self, df: pd.DataFrame) -> bool:
         """Validate OHLCV data quality"""
         if df is None or len(df) == 0:
@@ -433,71 +527,104 @@ class DataLayer:
 
     # ==================== TECHNICAL INDICATORS ====================
 
-    def calculate_indicators(self, ohlcv: pd.DataFrame) -> Dict:
-        """Calculate all technical indicators (vectorized)"""
+    def calculate_indicators(self, ohlcv: pd.DataFrame) -> IndicatorSnapshot:
+        """
+        Calculate all technical indicators (vectorized)
+        Memoized per OHLCV frame, so strategies sharing a cached frame compute it once
+        """
         if ohlcv is None or len(ohlcv) < 50:
-            return {}
+            return IndicatorSnapshot()
+
+        # The entry holds a reference to the frame, so a matching id is the same object
+        cached = self._indicator_cache.get(id(ohlcv))
+        if cached is not None and cached[0] is ohlcv:
+            return cached[1]
 
-        indicators = {}
+        indicators = IndicatorSnapshot()
+        macd_histogram = None
 
         try:
+            # Raw columns as float arrays, for strategies that scan bars directly
+            indicators.arrays = {col: ohlcv[col].to_numpy(dtype=float) for col in ('close', 'high', 'low', 'volume')}
+
             # Moving averages
-            indicators['sma_20'] = ohlcv['close'].rolling(20).mean().iloc[-1]
-            indicators['sma_50'] = ohlcv['close'].rolling(50).mean().iloc[-1]
-            indicators['ema_9'] = ohlcv['close'].ewm(span=9).mean().iloc[-1]
-            indicators['ema_21'] = ohlcv['close'].ewm(span=21).mean().iloc[-1]
+            indicators.sma_20 = ohlcv['close'].rolling(20).mean().iloc[-1]
+            indicators.sma_50 = ohlcv['close'].rolling(50).mean().iloc[-1]
+            indicators.ema_9 = ohlcv['close'].ewm(span=9).mean().iloc[-1]
+            indicators.ema_21 = ohlcv['close'].ewm(span=21).mean().iloc[-1]
 
             # RSI (14)
-            indicators['rsi'] = self._calculate_rsi(ohlcv['close'], 14)
+            indicators.rsi = _rsi_last(indicators.arrays['close'], 14)
 
             # MACD
-            macd, signal, hist = self._calculate_macd(ohlcv['close'])
-            indicators['macd'] = macd
-            indicators['macd_signal'] = signal
-            indicators['macd_hist'] = hist
+            macd_line, signal_line, histogram = self._macd_series(ohlcv['close'])
+            macd_histogram = histogram.to_numpy()
+            indicators.macd = macd_line.iloc[-1]
+            indicators.macd_signal = signal_line.iloc[-1]
+            indicators.macd_hist = macd_histogram[-1]
 
             # ATR (14)
-            indicators['atr'] = self._calculate_atr(ohlcv, 14)
+            indicators.atr = self._calculate_atr(ohlcv, 14)
 
             # VWAP
-            indicators['vwap'] = self._calculate_vwap(ohlcv)
+            indicators.vwap = self._calculate_vwap(ohlcv)
 
             # Bollinger Bands
             bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(ohlcv['close'], 20, 2)
-            indicators['bb_upper'] = bb_upper
-            indicators['bb_middle'] = bb_middle
-            indicators['bb_lower'] = bb_lower
+            indicators.bb_upper = bb_upper
+            indicators.bb_middle = bb_middle
+            indicators.bb_lower = bb_lower
 
             # ADX (14)
-            indicators['adx'] = self._calculate_adx(ohlcv, 14)
+            indicators.adx = self._calculate_adx(ohlcv, 14)
 
             # Volume SMA
-            indicators['volume_sma'] = ohlcv['volume'].rolling(20).mean().iloc[-1]
+            indicators.volume_sma = ohlcv['volume'].rolling(20).mean().iloc[-1]
 
             # Current price
-            indicators['close'] = ohlcv['close'].iloc[-1]
+            indicators.close = ohlcv['close'].iloc[-1]
 
         except Exception as e:
             logger.error(f"Error calculating indicators: {e}")
 
+        if len(self._indicator_cache) >= self.INDICATOR_CACHE_SIZE:
+            self._indicator_cache.clear()
+        self._indicator_cache[id(ohlcv)] = (ohlcv, indicators, macd_histogram)
+
         return indicators
 
+    def calculate_macd_histogram(self, ohlcv: pd.DataFrame) -> np.ndarray:
+        """
+        MACD histogram for every bar (same EWMs as calculate_indicators)
+        EWM is causal, so value [-1-i] equals the histogram recomputed on ohlcv.iloc[:-i]
+        """
+        if ohlcv is None or len(ohlcv) == 0:
+            return np.empty(0)
+
+        # Reuse the pass calculate_indicators already made over this frame
+        cached = self._indicator_cache.get(id(ohlcv))
+        if cached is not None and cached[0] is ohlcv and cached[2] is not None:
+            return cached[2]
+
+        _, _, histogram = self._macd_series(ohlcv['close'])
+        return histogram.to_numpy()
+
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
         """Calculate RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.iloc[-1]
+        return _rsi_last(prices.to_numpy(dtype=float), period)
 
-    def _calculate_macd(self, prices: pd.Series, fast=12, slow=26, signal=9) -> Tuple[float, float, float]:
-        """Calculate MACD"""
+    def _macd_series(self, prices: pd.Series, fast=12, slow=26, signal=9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """MACD line, signal line and histogram series"""
         ema_fast = prices.ewm(span=fast).mean()
         ema_slow = prices.ewm(span=slow).mean()
         macd_line = ema_fast - ema_slow
         signal_line = macd_line.ewm(span=signal).mean()
         histogram = macd_line - signal_line
+        return macd_line, signal_line, histogram
+
+    def _calculate_macd(self, prices: pd.Series, fast=12, slow=26, signal=9) -> Tuple[float, float, float]:
+        """Calculate MACD"""
+        macd_line, signal_line, histogram = self._macd_series(prices, fast, slow, signal)
         return macd_line.iloc[-1], signal_line.iloc[-1], histogram.iloc[-1]
 
     def _calculate_atr(self, ohlcv: pd.DataFrame, period: int = 14) -> float:
@@ -681,10 +808,10 @@ if __name__ == "__main__":
     print("\n=== TEST 3: Technical Indicators ===")
     if ohlcv is not None:
         indicators = data.calculate_indicators(ohlcv)
-        print(f"RSI: {indicators.get('rsi', 0):.2f}")
-        print(f"MACD: {indicators.get('macd', 0):.2f}")
-        print(f"ATR: {indicators.get('atr', 0):.2f}")
-        print(f"ADX: {indicators.get('adx', 0):.2f}")
+        print(f"RSI: {indicators.rsi:.2f}")
+        print(f"MACD: {indicators.macd:.2f}")
+        print(f"ATR: {indicators.atr:.2f}")
+        print(f"ADX: {indicators.adx:.2f}")
 
     # Test 4: Get news and sentiment
     print("\n=== TEST 4: News & Sentiment ===")
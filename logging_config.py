@@ -3,24 +3,29 @@ Centralized logging configuration with UTF-8 support for Windows
 Ensures emojis and Unicode characters display correctly
 """
 
+import atexit
 import logging
+import queue
 import sys
 import io
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+# One queue + background listener per log file, shared by every module's logger
+_queue_handlers = {}
 
-def setup_logging(name: str = None, log_file: str = './data/tradego.log', level=logging.INFO):
-    """
-    Configure logging with UTF-8 encoding for Windows compatibility
 
-    Args:
-        name: Logger name (use __name__ from calling module)
-        log_file: Path to log file
-        level: Logging level
+def _get_queue_handler(log_file: str) -> QueueHandler:
+    """
+    Get the QueueHandler for log_file, starting its listener thread on first use
 
-    Returns:
-        Configured logger instance
+    Callers only enqueue records; formatting and console/file writes happen
+    on the listener thread, off the trading loop.
     """
+    handler = _queue_handlers.get(log_file)
+    if handler is not None:
+        return handler
+
     # Ensure data directory exists
     Path(log_file).parent.mkdir(parents=True, exist_ok=True)
 
@@ -45,6 +50,29 @@ def setup_logging(name: str = None, log_file: str = './data/tradego.log', level=
     console_handler.setFormatter(formatter)
     file_handler.setFormatter(formatter)
 
+    # Drain the queue on a background thread; flush remaining records at exit
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    handler = QueueHandler(log_queue)
+    _queue_handlers[log_file] = handler
+    return handler
+
+
+def setup_logging(name: str = None, log_file: str = './data/tradego.log', level=logging.INFO):
+    """
+    Configure logging with UTF-8 encoding for Windows compatibility
+
+    Args:
+        name: Logger name (use __name__ from calling module)
+        log_file: Path to log file
+        level: Logging level
+
+    Returns:
+        Configured logger instance
+    """
     # Get or create logger
     logger = logging.getLogger(name) if name else logging.getLogger()
     logger.setLevel(level)
@@ -52,9 +80,8 @@ def setup_logging(name: str = None, log_file: str = './data/tradego.log', level=
     # Remove existing handlers to avoid duplicates
     logger.handlers.clear()
 
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Route records through the shared queue (real handlers run on the listener thread)
+    logger.addHandler(_get_queue_handler(log_file))
 
     return logger
 
@@ -3,18 +3,30 @@ Orchestrator - Main trading loop that coordinates all modules
 Runs 24/7, executes trades during market hours, monitors positions
 """
 
+import asyncio
+import logging
+import signal
 import time
-import schedule
-from datetime import datetime, time as dt_time
+from datetime import datetime, timedelta, time as dt_time
 from typing import List
 
+import numpy as np
+
 from logging_config import setup_logging
 from pnl_engine import get_pnl_engine, Trade
 from data_layer import get_data_layer
 from signal_engine import get_signal_engine
 from risk_manager import get_risk_manager, RiskLimits
 from upstox_integration import get_upstox_integration
-from settings_manager import load_settings
+from upstox_operator import ORDER_FINAL_STATES
+from settings_manager import load_trading_settings
+
+# Faster libuv-based event loop (optional, not available on Windows)
+try:
+    import uvloop
+    _HAS_UVLOOP = True
+except ImportError:
+    _HAS_UVLOOP = False
 
 # Setup logging with UTF-8 support
 logger = setup_logging(__name__)
@@ -23,11 +35,28 @@ logger = setup_logging(__name__)
 class Orchestrator:
     """Main trading system orchestrator"""
 
+    # Market hours: 9:15 AM to 3:30 PM IST (Monday-Friday)
+    MARKET_OPEN = dt_time(9, 15)
+    MARKET_CLOSE = dt_time(15, 30)
+
+    # How long a fetched Upstox balance is reused (seconds)
+    BALANCE_CACHE_TTL = 60
+
+    # P&L sign per direction: +1 long, -1 short
+    DIRECTION_SIGN = {'BUY': 1, 'SELL': -1}
+
+    # Intraday positions are squared off at this time (HH:MM)
+    EOD_SQUAREOFF_AT = "15:20"
+
+    # Polling for a square-off order to fill before the trade record is closed
+    EXIT_FILL_POLLS = 10
+    EXIT_FILL_POLL_INTERVAL = 0.5  # seconds
+
     def __init__(self):
         # Load settings from dashboard UI (settings_manager)
-        self.settings = load_settings()
-        self.trading_mode = self.settings['mode']
-        self.live_type = self.settings.get('live_type', 'PAPER')
+        self.settings = load_trading_settings()
+        self.trading_mode = self.settings.mode
+        self.live_type = self.settings.live_type
 
         # Initialize all modules
         self.pnl_engine = get_pnl_engine()
@@ -36,10 +65,27 @@ class Orchestrator:
         self.risk_manager = get_risk_manager()
         self.upstox_integration = get_upstox_integration()
 
-        # Trading state
-        self.trading_enabled = True
+        # Mode is fixed for the process lifetime - bind the order/exit paths once
+        live_real = self.trading_mode == 'LIVE' and self.live_type == 'REAL'
+        self._place_trade_impl = self._place_live_real if live_real else self._place_paper
+        self._exit_trade_impl = self._exit_live_real if live_real else self._exit_paper
+
+        # Trading state (events let loops block instead of polling flags)
+        self._enabled = asyncio.Event()
+        self._enabled.set()
+        self._shutdown = asyncio.Event()
         self.last_scan_time = None
         self.live_balance = None
+        self._balance_fetched_at = 0.0
+
+        # Circuit breaker threshold in rupees, recomputed only when capital changes
+        self._max_loss_pct = self.settings.max_daily_loss_percent / 100
+        self._max_loss_capital = None
+        self._max_loss_abs = 0.0
+
+        # LIVE exits: trades with an exit in progress, and square-off orders not yet filled
+        self._exiting = set()
+        self._pending_exits = {}
 
         logger.info("=" * 60)
         logger.info(f"TradeGo Orchestrator Initialized")
@@ -47,55 +93,59 @@ class Orchestrator:
         logger.info(f"Settings: {self.settings}")
         logger.info("=" * 60)
 
-    def get_capital(self) -> float:
+    async def get_capital(self) -> float:
         """Get trading capital based on mode"""
         # LIVE + REAL = Fetch from Upstox
         if self.trading_mode == 'LIVE' and self.live_type == 'REAL':
+            # Reuse a recent balance instead of round-tripping to Upstox
+            if self.live_balance is not None and \
+                    time.monotonic() - self._balance_fetched_at < self.BALANCE_CACHE_TTL:
+                return self.live_balance
+
             try:
-                operator = self.upstox_integration.get_operator()
+                operator = await asyncio.to_thread(self.upstox_integration.get_operator)
                 if operator:
-                    funds = operator.get_funds()
+                    funds = await asyncio.to_thread(operator.get_funds)
                     if funds.get('status') == 'ok':
                         available = funds.get('equity', {}).get('available_margin', 0)
                         logger.info(f"💰 Live balance from Upstox: ₹{available:,.2f}")
                         self.live_balance = available
+                        self._balance_fetched_at = time.monotonic()
                         return available
                 logger.warning("⚠️  Failed to fetch Upstox balance, using settings capital")
             except Exception as e:
                 logger.error(f"❌ Error fetching live balance: {e}")
 
         # BACKTEST or LIVE+PAPER = Use settings capital
-        return self.settings.get('capital', 1000000)
+        return self.settings.capital
 
-    def is_market_open(self) -> bool:
-        """Check if market is open"""
-        now = datetime.now()
+    def is_market_open(self, now: datetime = None) -> bool:
+        """Check if market is open (at `now`, defaults to the current time)"""
+        if now is None:
+            now = datetime.now()
 
-        # Market hours: 9:15 AM to 3:30 PM IST (Monday-Friday)
         if now.weekday() >= 5:  # Saturday=5, Sunday=6
             return False
 
-        market_open = dt_time(9, 15)
-        market_close = dt_time(15, 30)
-
-        current_time = now.time()
+        return self.MARKET_OPEN <= now.time() <= self.MARKET_CLOSE
 
-        return market_open <= current_time <= market_close
-
-    def main_trading_loop(self):
+    async def main_trading_loop(self):
         """Main trading loop - runs every 15 minutes"""
         try:
+            # One clock read per cycle
+            now = datetime.now()
+
             logger.info("\n" + "=" * 60)
             logger.info("MAIN TRADING LOOP STARTED")
             logger.info("=" * 60)
 
             # Check if trading is enabled
-            if not self.trading_enabled:
+            if not self._enabled.is_set():
                 logger.info("Trading is DISABLED. Skipping cycle.")
                 return
 
             # Check if market is open - ONLY for LIVE modes
-            if self.trading_mode == 'LIVE' and not self.is_market_open():
+            if self.trading_mode == 'LIVE' and not self.is_market_open(now):
                 logger.info("Market is CLOSED. Skipping cycle (LIVE mode).")
                 return
 
@@ -105,46 +155,58 @@ class Orchestrator:
 
 
             # Get portfolio state
-            portfolio = self.pnl_engine.get_daily_pnl()
-            open_trades = self.pnl_engine.get_open_trades()
+            portfolio = await asyncio.to_thread(self.pnl_engine.get_daily_pnl)
+            open_trades = await asyncio.to_thread(self.pnl_engine.get_open_trades)
 
             logger.info(f"Portfolio: Total P&L: ₹{portfolio.total_pnl:,.2f} ({portfolio.win_rate:.1f}% win rate)")
             logger.info(f"Open Positions: {len(open_trades)}")
 
             # Check circuit breaker
-            capital = self.get_capital()
-            daily_loss_percent = portfolio.total_pnl / capital
-            max_loss_pct = self.settings.get('max_daily_loss_percent', 2.0) / 100
-            if daily_loss_percent < -max_loss_pct:
-                logger.warning(f"⚠️  CIRCUIT BREAKER TRIGGERED: {daily_loss_percent:.2%} daily loss")
-                self.trading_enabled = False
+            capital = await self.get_capital()
+            if capital != self._max_loss_capital:
+                self._max_loss_capital = capital
+                self._max_loss_abs = -capital * self._max_loss_pct
+            if portfolio.total_pnl < self._max_loss_abs:
+                logger.warning(f"⚠️  CIRCUIT BREAKER TRIGGERED: {portfolio.total_pnl / capital:.2%} daily loss")
+                self._enabled.clear()
                 return
 
             # Get hybrid watchlist
             logger.info("\nFetching watchlist...")
-            watchlist = self.data_layer.get_watchlist()
+            watchlist = await asyncio.to_thread(self.data_layer.get_watchlist)
             logger.info(f"Watchlist: {len(watchlist)} symbols")
 
+            # Drop symbols we already hold before running strategies on them
+            open_symbols = {t.symbol for t in open_trades}
+            if open_symbols and watchlist:
+                symbols = np.asarray(watchlist, dtype=str)
+                watchlist = symbols[~np.isin(symbols, list(open_symbols))].tolist()
+                logger.info(f"Scanning {len(watchlist)} symbols without open positions")
+
             # Generate signals
             logger.info("\nGenerating signals...")
-            signals = self.signal_engine.generate_signals(watchlist)
+            signals = await asyncio.to_thread(self.signal_engine.generate_signals, watchlist)
             logger.info(f"Generated {len(signals)} signals")
 
-            # Execute top signals
-            executed_count = 0
+            # Drop invalid signals (R:R, stop distance, confidence) in one vectorized pass
+            signals = self.signal_engine.validate_signals(signals)
+
+            # Approve top signals serially (so capital/limits are never double-spent),
+            # then place all approved orders concurrently
+            approved = []
+            reserved_capital = {'I': 0.0, 'D': 0.0}
+            reserved_heat = 0.0
+            max_pos = self.settings.max_positions
             for signal in signals:
                 try:
-                    # Validate signal
-                    if not self.signal_engine.validate_signal(signal):
-                        continue
-
                     # Check if we already have position in this symbol
-                    if any(t.symbol == signal.symbol for t in open_trades):
+                    if signal.symbol in open_symbols:
                         logger.info(f"  ⏭️  Skipping {signal.symbol}: Already have position")
                         continue
 
-                    # Calculate position size
+                    # Calculate position size (minus capital reserved by approved signals)
                     available_capital = self.risk_manager.get_available_capital(signal.product, portfolio)
+                    available_capital = max(available_capital - reserved_capital.get(signal.product, 0.0), 0)
                     position_size = self.risk_manager.calculate_position_size(signal, available_capital)
 
                     if not position_size:
@@ -153,21 +215,23 @@ class Orchestrator:
 
                     # Check portfolio limits
                     allowed, reason = self.risk_manager.check_portfolio_limits(
-                        signal, position_size, open_trades, portfolio
+                        signal, position_size, open_trades, portfolio, reserved_heat
                     )
 
                     if not allowed:
                         logger.info(f"  ⏭️  Skipping {signal.symbol}: {reason}")
                         continue
 
-                    # Check correlation
-                    allowed, reason = self.risk_manager.check_correlation(signal.symbol, open_trades)
+                    # Check correlation (may fetch daily OHLCV, so keep it off the event loop)
+                    allowed, reason = await asyncio.to_thread(
+                        self.risk_manager.check_correlation, signal.symbol, open_trades
+                    )
 
                     if not allowed:
                         logger.info(f"  ⏭️  Skipping {signal.symbol}: {reason}")
                         continue
 
-                    # Execute trade
+                    # Approve trade
                     logger.info(f"\n  🎯 EXECUTING TRADE:")
                     logger.info(f"     Symbol: {signal.symbol}")
                     logger.info(f"     Strategy: {signal.strategy}")
@@ -179,110 +243,143 @@ class Orchestrator:
                     logger.info(f"     Confidence: {signal.confidence:.1%}")
                     logger.info(f"     Risk: ₹{position_size.risk_amount:,.2f} (R:R={position_size.rr_ratio:.2f})")
 
-                    success = self.place_trade(signal, position_size)
-
-                    if success:
-                        executed_count += 1
-                        open_trades = self.pnl_engine.get_open_trades()  # Refresh list
-
-                        # Stop if we've reached max positions
-                        max_pos = self.settings.get('max_positions', 5)
-                        if len(open_trades) >= max_pos:
-                            logger.info(f"\n  ✅ Max positions reached. Stopping execution.")
-                            break
+                    approved.append((signal, position_size))
+                    reserved_capital[signal.product] = reserved_capital.get(signal.product, 0.0) + \
+                        position_size.capital_required
+                    reserved_heat += position_size.risk_amount
+
+                    # Count the pending trade against later signals' limit/correlation checks
+                    open_trades = open_trades + [Trade(
+                        trade_id='PENDING',
+                        symbol=signal.symbol,
+                        strategy=signal.strategy,
+                        entry_time=now,
+                        entry_price=signal.entry_price,
+                        quantity=position_size.quantity,
+                        product=signal.product,
+                        direction=signal.direction,
+                        stop_loss=signal.stop_loss,
+                        target=signal.target,
+                        risk_amount=position_size.risk_amount
+                    )]
+                    open_symbols.add(signal.symbol)
+
+                    # Stop if we've reached max positions
+                    if len(open_trades) >= max_pos:
+                        logger.info(f"\n  ✅ Max positions reached. Stopping execution.")
+                        break
 
                 except Exception as e:
                     logger.error(f"  ❌ Error executing signal for {signal.symbol}: {e}")
 
+            # Place approved orders concurrently (Upstox calls run in worker threads)
+            results = await asyncio.gather(
+                *[self._place_trade_impl(signal, position_size) for signal, position_size in approved],
+                return_exceptions=True
+            )
+            for (signal, _), result in zip(approved, results):
+                if isinstance(result, Exception):
+                    logger.error(f"  ❌ Error executing signal for {signal.symbol}: {result}")
+            executed_count = sum(result is True for result in results)
+
             logger.info(f"\n✅ Trading cycle complete: {executed_count} trades executed")
-            self.last_scan_time = datetime.now()
+            self.last_scan_time = now
 
         except Exception as e:
             logger.error(f"❌ Error in main trading loop: {e}", exc_info=True)
 
-    def place_trade(self, signal, position_size) -> bool:
+    async def place_trade(self, signal, position_size) -> bool:
         """
         Place trade - LIVE mode places real orders, BACKTEST mode creates paper trades
         Returns True if successful
         """
-        try:
-            entry_order_id = None
-            target_order_id = None
-            sl_order_id = None
-
-            # LIVE + REAL: Place real order through Upstox
-            if self.trading_mode == 'LIVE' and self.live_type == 'REAL':
-                logger.info(f"  🔴 LIVE MODE (REAL MONEY): Placing real order on Upstox...")
-
-                operator = self.upstox_integration.get_operator()
-                if not operator:
-                    logger.error("  ❌ Cannot place live order: Upstox operator not available")
-                    return False
+        return await self._place_trade_impl(signal, position_size)
 
-                # Place order with mandatory stop-loss
-                result = operator.place_order(
-                    symbol=signal.symbol,
-                    side=signal.direction,
-                    qty=position_size.quantity,
-                    price=signal.entry_price if signal.entry_price else None,
-                    order_type='MARKET',
-                    product=signal.product,
-                    stop_loss=signal.stop_loss,
-                    target=signal.target,
-                    live=True,  # Execute real order
-                    tag=f"{signal.strategy}"
-                )
-
-                if result.get('status') == 'success':
-                    entry_order_id = result.get('entry', {}).get('order_id')
-                    target_order_id = result.get('exits', {}).get('target', {}).get('order_id')
-                    sl_order_id = result.get('exits', {}).get('stop_loss', {}).get('order_id')
-
-                    logger.info(f"  ✅ Live order placed successfully!")
-                    logger.info(f"     Entry Order ID: {entry_order_id}")
-                    logger.info(f"     Target Order ID: {target_order_id}")
-                    logger.info(f"     SL Order ID: {sl_order_id}")
-                else:
-                    logger.error(f"  ❌ Live order failed: {result.get('error')}")
-                    return False
+    async def _place_live_real(self, signal, position_size) -> bool:
+        """LIVE + REAL: Place real order through Upstox, then record it"""
+        try:
+            logger.info(f"  🔴 LIVE MODE (REAL MONEY): Placing real order on Upstox...")
 
-            else:
-                # BACKTEST or LIVE+PAPER: Paper trading
-                mode_str = "LIVE (PAPER)" if self.trading_mode == 'LIVE' else "BACKTEST"
-                logger.info(f"  📝 {mode_str} MODE: Creating paper trade...")
+            operator = await asyncio.to_thread(self.upstox_integration.get_operator)
+            if not operator:
+                logger.error("  ❌ Cannot place live order: Upstox operator not available")
+                return False
 
-            # Create trade record in database (for both LIVE and BACKTEST)
-            trade = self.pnl_engine.create_trade(
+            # Place order with mandatory stop-loss
+            result = await asyncio.to_thread(
+                operator.place_order,
                 symbol=signal.symbol,
-                strategy=signal.strategy,
-                direction=signal.direction,
-                quantity=position_size.quantity,
-                entry_price=signal.entry_price,
+                side=signal.direction,
+                qty=position_size.quantity,
+                price=signal.entry_price if signal.entry_price else None,
+                order_type='MARKET',
+                product=signal.product,
                 stop_loss=signal.stop_loss,
                 target=signal.target,
-                product=signal.product,
-                risk_amount=position_size.risk_amount,
-                confidence=signal.confidence,
-                news_score=signal.news_score,
-                tech_score=signal.tech_score,
-                entry_order_id=entry_order_id,
-                target_order_id=target_order_id,
-                sl_order_id=sl_order_id
+                live=True,  # Execute real order
+                tag=f"{signal.strategy}"
             )
 
-            logger.info(f"  ✅ Trade recorded: {trade.trade_id} | Mode: {self.trading_mode}")
+            if result.get('status') != 'success':
+                logger.error(f"  ❌ Live order failed: {result.get('error')}")
+                return False
+
+            entry_order_id = result.get('entry', {}).get('order_id')
+            target_order_id = result.get('exits', {}).get('target', {}).get('order_id')
+            sl_order_id = result.get('exits', {}).get('stop_loss', {}).get('order_id')
+
+            logger.info(f"  ✅ Live order placed successfully!")
+            logger.info(f"     Entry Order ID: {entry_order_id}")
+            logger.info(f"     Target Order ID: {target_order_id}")
+            logger.info(f"     SL Order ID: {sl_order_id}")
+
+            self._record_trade(signal, position_size, entry_order_id, target_order_id, sl_order_id)
             return True
 
         except Exception as e:
             logger.error(f"  ❌ Error placing trade: {e}", exc_info=True)
             return False
 
-    def position_monitor_loop(self):
-        """Monitor open positions every 30 seconds"""
+    async def _place_paper(self, signal, position_size) -> bool:
+        """BACKTEST or LIVE+PAPER: Paper trading - only record the trade"""
         try:
-            if not self.trading_enabled:
-                return
+            mode_str = "LIVE (PAPER)" if self.trading_mode == 'LIVE' else "BACKTEST"
+            logger.info(f"  📝 {mode_str} MODE: Creating paper trade...")
+
+            self._record_trade(signal, position_size)
+            return True
 
+        except Exception as e:
+            logger.error(f"  ❌ Error placing trade: {e}", exc_info=True)
+            return False
+
+    def _record_trade(self, signal, position_size, entry_order_id=None,
+                      target_order_id=None, sl_order_id=None) -> Trade:
+        """Create trade record in database (for both LIVE and BACKTEST)"""
+        trade = self.pnl_engine.create_trade(
+            symbol=signal.symbol,
+            strategy=signal.strategy,
+            direction=signal.direction,
+            quantity=position_size.quantity,
+            entry_price=signal.entry_price,
+            stop_loss=signal.stop_loss,
+            target=signal.target,
+            product=signal.product,
+            risk_amount=position_size.risk_amount,
+            confidence=signal.confidence,
+            news_score=signal.news_score,
+            tech_score=signal.tech_score,
+            entry_order_id=entry_order_id,
+            target_order_id=target_order_id,
+            sl_order_id=sl_order_id
+        )
+
+        logger.info(f"  ✅ Trade recorded: {trade.trade_id} | Mode: {self.trading_mode}")
+        return trade
+
+    async def position_monitor_loop(self):
+        """Monitor open positions every 30 seconds - also while the circuit breaker has trading disabled"""
+        try:
             # Only check market hours for LIVE modes
             if self.trading_mode == 'LIVE' and not self.is_market_open():
                 return
@@ -292,32 +389,164 @@ class Orchestrator:
             if not open_trades:
                 return
 
-            logger.debug(f"Monitoring {len(open_trades)} positions...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Monitoring {len(open_trades)} positions...")
 
-            for trade in open_trades:
-                try:
-                    # Get current price (TODO: Replace with real Upstox price)
-                    # For now, use a dummy price
-                    # current_price = self.upstox.get_ltp(trade.symbol)
-
-                    # Update MAE/MFE
-                    # self.pnl_engine.update_position(trade.trade_id, current_price)
+            ltp_map = await self._fetch_ltps(open_trades)
+            priced = [t for t in open_trades if t.symbol in ltp_map]
+            if not priced:
+                return
 
-                    # Check if near EOD for intraday trades
-                    if trade.product == 'I':
-                        now = datetime.now()
-                        if now.hour == 15 and now.minute >= 20:
-                            logger.info(f"  📤 EOD Square-off: {trade.symbol}")
-                            # TODO: Square off intraday position
-                            # self.pnl_engine.close_trade(trade.trade_id, current_price, "EOD_SQUAREOFF")
+            # Update MAE/MFE for all priced positions in one transaction
+            self.pnl_engine.update_positions_bulk([(t.trade_id, ltp_map[t.symbol]) for t in priced])
 
-                except Exception as e:
-                    logger.error(f"Error monitoring {trade.trade_id}: {e}")
+            # Only trades whose price crossed a level go on to exit handling
+            exits = self._triggered_exits(priced, ltp_map)
+            results = await asyncio.gather(
+                *[self._exit_trade_impl(trade, price, reason) for trade, price, reason in exits],
+                return_exceptions=True
+            )
+            for (trade, _, _), result in zip(exits, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error monitoring {trade.trade_id}: {result}")
 
         except Exception as e:
             logger.error(f"Error in position monitor: {e}")
 
-    def daily_summary(self):
+    async def _fetch_ltps(self, trades: List[Trade]) -> dict:
+        """Fetch LTPs for all trades in a single batched quote call"""
+        operator = await asyncio.to_thread(self.upstox_integration.get_operator)
+        if not operator:
+            return {}
+        return await asyncio.to_thread(operator.get_ltp_batch, [t.symbol for t in trades])
+
+    def _triggered_exits(self, trades: List[Trade], ltp_map: dict) -> List[tuple]:
+        """Return (trade, price, reason) for trades that hit stop-loss or target"""
+        prices = np.fromiter((ltp_map[t.symbol] for t in trades), dtype=float, count=len(trades))
+        signs = np.fromiter((self.DIRECTION_SIGN.get(t.direction, 1) for t in trades), dtype=float, count=len(trades))
+        stops = np.fromiter((t.stop_loss for t in trades), dtype=float, count=len(trades))
+        targets = np.fromiter((t.target for t in trades), dtype=float, count=len(trades))
+
+        # Signed distance works for both long and short; stop-loss wins if both are hit
+        hit_sl = signs * (prices - stops) <= 0
+        hit_target = ~hit_sl & (signs * (prices - targets) >= 0)
+
+        exits = [(trades[i], float(prices[i]), "STOP_LOSS") for i in np.flatnonzero(hit_sl)]
+        exits += [(trades[i], float(prices[i]), "TARGET") for i in np.flatnonzero(hit_target)]
+        return exits
+
+    async def _exit_trade(self, trade: Trade, exit_price: float, reason: str) -> bool:
+        """
+        Exit an open position - LIVE mode squares off on Upstox first,
+        paper modes only close the trade record
+        """
+        return await self._exit_trade_impl(trade, exit_price, reason)
+
+    async def _exit_live_real(self, trade: Trade, exit_price: float, reason: str) -> bool:
+        """
+        LIVE + REAL: Cancel the resting target/SL legs, square off on Upstox,
+        and close the trade record only once the position is confirmed flat
+        """
+        # The monitor and EOD square-off can race on the same trade
+        if trade.trade_id in self._exiting:
+            return False
+
+        self._exiting.add(trade.trade_id)
+        try:
+            return await self._exit_live_real_once(trade, exit_price, reason)
+        finally:
+            self._exiting.discard(trade.trade_id)
+
+    async def _exit_live_real_once(self, trade: Trade, exit_price: float, reason: str) -> bool:
+        logger.info(f"  📤 {reason}: {trade.symbol} @ ₹{exit_price:.2f}")
+
+        operator = await asyncio.to_thread(self.upstox_integration.get_operator)
+        if not operator:
+            logger.error("  ❌ Cannot square off: Upstox operator not available")
+            return False
+
+        # An exit order from an earlier attempt is awaited rather than sending another one
+        order_id = self._pending_exits.get(trade.trade_id)
+        if order_id is None:
+            # Cancel the broker-side exit legs first, or they can later fill into a naked position
+            for leg_id in (trade.target_order_id, trade.sl_order_id):
+                if not leg_id:
+                    continue
+                result = await asyncio.to_thread(operator.cancel_order, leg_id, live=True)
+                if result.get('status') != 'ok':
+                    logger.error(f"  ❌ Could not cancel exit order {leg_id} for {trade.symbol}: "
+                                 f"{result.get('message') or result.get('error')}")
+                    return False
+
+            result = await asyncio.to_thread(operator.square_off, symbol=trade.symbol, live=True)
+            if result.get('status') != 'ok':
+                logger.error(f"  ❌ Square-off failed for {trade.symbol}: {result.get('message') or result.get('error')}")
+                return False
+
+            order_id = result.get('order_id')
+            if not order_id:
+                # Positions were fetched and show nothing open (e.g. the SL leg filled first)
+                logger.info(f"  ✅ {trade.symbol} already flat at broker ({result.get('message')})")
+                self.pnl_engine.close_trade(trade.trade_id, exit_price, reason)
+                return True
+            self._pending_exits[trade.trade_id] = order_id
+
+        state, fill_price = await self._await_fill(operator, order_id)
+        if state != 'complete':
+            if state is not None:
+                # Rejected / cancelled: the position is still open, send a fresh exit next time
+                self._pending_exits.pop(trade.trade_id, None)
+                logger.error(f"  ❌ Exit order {order_id} for {trade.symbol} was {state}")
+            else:
+                logger.warning(f"  ⏳ Exit order {order_id} for {trade.symbol} not filled yet, will recheck")
+            return False
+
+        self._pending_exits.pop(trade.trade_id, None)
+        self.pnl_engine.close_trade(trade.trade_id, fill_price or exit_price, reason)
+        return True
+
+    async def _await_fill(self, operator, order_id: str) -> tuple:
+        """Poll an order until it reaches a final state; returns (state, average price) or (None, 0.0)"""
+        for attempt in range(self.EXIT_FILL_POLLS):
+            if attempt:
+                await asyncio.sleep(self.EXIT_FILL_POLL_INTERVAL)
+            result = await asyncio.to_thread(operator.get_order, order_id)
+            order = result.get('order') or {}
+            state = (order.get('status') or '').lower()
+            if state in ORDER_FINAL_STATES:
+                return state, float(order.get('average_price') or 0.0)
+        return None, 0.0
+
+    async def _exit_paper(self, trade: Trade, exit_price: float, reason: str) -> bool:
+        """BACKTEST or LIVE+PAPER: Only close the trade record"""
+        logger.info(f"  📤 {reason}: {trade.symbol} @ ₹{exit_price:.2f}")
+        self.pnl_engine.close_trade(trade.trade_id, exit_price, reason)
+        return True
+
+    async def eod_squareoff(self):
+        """Square off all open intraday positions - runs once a day at EOD_SQUAREOFF_AT"""
+        # Not gated on _enabled: a tripped loss breaker must still flatten intraday positions
+        if self.trading_mode == 'LIVE' and not self.is_market_open():
+            return
+
+        intraday = [t for t in self.pnl_engine.get_open_trades() if t.product == 'I']
+        if not intraday:
+            return
+
+        logger.info(f"\n⏰ EOD Square-off: {len(intraday)} intraday positions")
+        ltp_map = await self._fetch_ltps(intraday)
+
+        for trade in intraday:
+            current_price = ltp_map.get(trade.symbol)
+            if current_price is None:
+                logger.warning(f"  ⚠️  No LTP for {trade.symbol}, cannot square off")
+                continue
+            try:
+                await self._exit_trade_impl(trade, current_price, "EOD_SQUAREOFF")
+            except Exception as e:
+                logger.error(f"  ❌ Error squaring off {trade.trade_id}: {e}")
+
+    async def daily_summary(self):
         """Generate daily summary report"""
         try:
             logger.info("\n" + "=" * 60)
@@ -339,8 +568,65 @@ class Orchestrator:
 
     def run(self):
         """Start the orchestrator"""
+        if _HAS_UVLOOP:
+            uvloop.install()
+
+        try:
+            asyncio.run(self._scheduler())
+        except KeyboardInterrupt:
+            logger.info("\n⏹️  System stopped by user")
+
+    def stop(self):
+        """Request a graceful shutdown of all scheduled jobs"""
+        self._shutdown.set()
+        self._enabled.set()  # Wake jobs parked on the trading gate so they can exit
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep for `seconds`; returns True early if shutdown was requested"""
+        try:
+            await asyncio.wait_for(self._shutdown.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _every(self, interval: float, job, gated: bool = True):
+        """Run coroutine `job` every `interval` seconds (only while trading is enabled if `gated`)"""
+        while not await self._sleep(interval):
+            # Blocks at no cost while the circuit breaker has trading disabled
+            if gated:
+                await self._enabled.wait()
+            if self._shutdown.is_set():
+                break
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"Error in {job.__name__}: {e}", exc_info=True)
+
+    async def _daily_at(self, at: str, job):
+        """Run coroutine `job` once a day at local time `at` (HH:MM)"""
+        hour, minute = map(int, at.split(':'))
+        while not self._shutdown.is_set():
+            now = datetime.now()
+            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            if await self._sleep((next_run - now).total_seconds()):
+                break
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"Error in {job.__name__}: {e}", exc_info=True)
+
+    async def _scheduler(self):
+        """Single event loop driving all trading jobs"""
         logger.info("\n🚀 TradeGo System Starting...")
 
+        # Dashboard stops the system with SIGTERM - shut down cleanly
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self.stop)
+        except (NotImplementedError, AttributeError):
+            pass  # Signal handlers are not supported on Windows event loops
+
         # Display mode
         if self.trading_mode == 'LIVE' and self.live_type == 'REAL':
             logger.info(f"   Mode: 🔴 LIVE (REAL MONEY)")
@@ -348,47 +634,39 @@ class Orchestrator:
             logger.info(f"   Mode: 📝 LIVE (PAPER TRADING)")
         else:
             logger.info(f"   Mode: 📝 BACKTEST")
-            if self.settings.get('backtest_from') and self.settings.get('backtest_to'):
-                logger.info(f"   Date Range: {self.settings['backtest_from']} to {self.settings['backtest_to']}")
+            if self.settings.backtest_from and self.settings.backtest_to:
+                logger.info(f"   Date Range: {self.settings.backtest_from} to {self.settings.backtest_to}")
 
         # Display capital
-        capital = self.get_capital()
+        capital = await self.get_capital()
         capital_source = "Upstox" if self.live_balance else "Settings"
         logger.info(f"   Capital: ₹{capital:,.2f} ({capital_source})")
 
         # Display settings
-        logger.info(f"   Intraday: {self.settings.get('intraday_allocation', 0.7):.0%}")
-        logger.info(f"   Swing: {self.settings.get('swing_allocation', 0.3):.0%}")
-        logger.info(f"   Max Positions: {self.settings.get('max_positions', 5)}")
-        logger.info(f"   Max Daily Loss: {self.settings.get('max_daily_loss_percent', 2)}%")
-
-        # Schedule jobs
-        schedule.every(15).minutes.do(self.main_trading_loop)
-        schedule.every(30).seconds.do(self.position_monitor_loop)
-        schedule.every().day.at("15:35").do(self.daily_summary)
+        logger.info(f"   Intraday: {self.settings.intraday_allocation:.0%}")
+        logger.info(f"   Swing: {self.settings.swing_allocation:.0%}")
+        logger.info(f"   Max Positions: {self.settings.max_positions}")
+        logger.info(f"   Max Daily Loss: {self.settings.max_daily_loss_percent}%")
 
         # Different startup message based on mode
         if self.trading_mode == 'BACKTEST':
             logger.info("\n✅ BACKTEST mode - Running immediately with historical data!\n")
             # Run immediately for backtest
-            self.main_trading_loop()
+            await self.main_trading_loop()
         else:
             logger.info("\n✅ LIVE mode - Waiting for market hours (9:15 AM - 3:30 PM IST)...\n")
             # Run immediately if market is open
             if self.is_market_open():
-                self.main_trading_loop()
+                await self.main_trading_loop()
 
         # Main loop
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(1)
-            except KeyboardInterrupt:
-                logger.info("\n⏹️  System stopped by user")
-                break
-            except Exception as e:
-                logger.error(f"Error in main loop: {e}", exc_info=True)
-                time.sleep(60)  # Wait 1 minute before retrying
+        await asyncio.gather(
+            asyncio.create_task(self._every(15 * 60, self.main_trading_loop)),
+            asyncio.create_task(self._every(30, self.position_monitor_loop, gated=False)),
+            asyncio.create_task(self._daily_at(self.EOD_SQUAREOFF_AT, self.eod_squareoff)),
+            asyncio.create_task(self._daily_at("15:35", self.daily_summary)),
+        )
+        logger.info("\n⏹️  System stopped")
 
 
 if __name__ == "__main__":
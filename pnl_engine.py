@@ -4,40 +4,145 @@ Handles all trade state management, P&L calculations, and performance metrics
 """
 
 import sqlite3
-import json
+import threading
+import time
+import weakref
+from functools import lru_cache
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict
-from enum import Enum
+from typing import List, Dict, Optional, Set, Tuple, Iterator
+from dataclasses import dataclass, field, fields
 import logging
+import numpy as np
+
+try:
+    import pyarrow as pa
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
 
 logger = logging.getLogger(__name__)
 
+# P&L sign per direction: +1 long, -1 short (pnl = (price - entry) * qty * sign)
+_DIRECTION_SIGN = {"BUY": 1, "SELL": -1}
+
+def _now_ms() -> int:
+    """Current time as integer unix milliseconds"""
+    return time.time_ns() // 1_000_000
+
+
+def _to_ms(dt: datetime) -> int:
+    """Naive local datetime -> integer unix milliseconds"""
+    return int(dt.timestamp() * 1000)
 
-class TradeDirection(Enum):
-    BUY = "BUY"
-    SELL = "SELL"
 
+def _day_start_ms(d: date) -> int:
+    """Local midnight at the start of `d` as unix milliseconds"""
+    return _to_ms(datetime.combine(d, datetime.min.time()))
 
-class TradeProduct(Enum):
-    INTRADAY = "I"  # Intraday with margin
-    DELIVERY = "D"  # Delivery/Swing (no margin)
 
+class _Reader:
+    """A thread's read connection, dropped together with the thread's locals when it exits"""
+    __slots__ = ('conn', '__weakref__')
 
-class TradeStatus(Enum):
-    OPEN = "OPEN"
-    CLOSED = "CLOSED"
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+# Timestamps repeat heavily across rows (backtests, bulk fills); datetimes are immutable
+_parse_timestamp = lru_cache(maxsize=4096)(datetime.fromisoformat)
+
+# Exit and P&L columns are included so replayed CLOSED trades keep their outcome
+_SQL_INSERT_TRADE = """
+    INSERT INTO trades (
+        trade_id, symbol, strategy, entry_time, entry_price, quantity,
+        product, direction, stop_loss, target, risk_amount,
+        news_score, tech_score, confidence,
+        entry_order_id, target_order_id, sl_order_id, status, entry_time_ms,
+        exit_time, exit_time_ms, exit_price, exit_reason,
+        gross_pnl, brokerage, net_pnl, pnl_percent, mae, mfe, holding_minutes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+              ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
+# MIN/MAX keep the stored excursions monotonic even if another writer got there first
+_SQL_UPDATE_MAE_MFE = """
+    UPDATE trades
+    SET mae = MIN(mae, :mae), mfe = MAX(mfe, :mfe), updated_at = :now
+    WHERE trade_id = :trade_id AND status = 'OPEN'
+"""
+
+# pnl_percent is derived from the generated capital_used column (net_pnl bound twice: SET
+# expressions see the pre-update row)
+_SQL_CLOSE_TRADE = """
+    UPDATE trades
+    SET exit_time = ?, exit_time_ms = ?, exit_price = ?, exit_reason = ?,
+        gross_pnl = ?, brokerage = ?, net_pnl = ?,
+        pnl_percent = CASE WHEN capital_used > 0 THEN ? * 100.0 / capital_used ELSE 0.0 END,
+        holding_minutes = ?, status = ?, updated_at = ?
+    WHERE trade_id = ?
+    RETURNING pnl_percent
+"""
+
+_PORTFOLIO_UPSERT_COLUMNS = (
+    "starting_capital", "available_capital", "deployed_capital",
+    "realized_pnl", "unrealized_pnl", "total_pnl",
+    "intraday_pnl", "intraday_trades", "intraday_wins", "intraday_losses",
+    "swing_pnl", "swing_trades", "swing_wins", "swing_losses",
+    "max_drawdown", "current_drawdown", "portfolio_heat",
+    "win_rate", "profit_factor", "sharpe_ratio", "updated_at",
+)
+
+# Update in place on conflict (REPLACE deletes + reinserts the row and resets created_at)
+_SQL_UPSERT_PORTFOLIO = f"""
+    INSERT INTO daily_portfolio (date, {", ".join(_PORTFOLIO_UPSERT_COLUMNS)})
+    VALUES ({", ".join("?" * (len(_PORTFOLIO_UPSERT_COLUMNS) + 1))})
+    ON CONFLICT(date) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in _PORTFOLIO_UPSERT_COLUMNS)}
+"""
+
+# Day's closed-trade sums/counts in one row (TOTAL() yields 0.0 instead of NULL)
+_SQL_DAILY_AGG = """
+    SELECT
+        COUNT(*),
+        TOTAL(net_pnl),
+        TOTAL(CASE WHEN product = 'I' THEN net_pnl END),
+        COUNT(CASE WHEN product = 'I' THEN 1 END),
+        COUNT(CASE WHEN product = 'I' AND net_pnl > 0 THEN 1 END),
+        COUNT(CASE WHEN product = 'I' AND net_pnl < 0 THEN 1 END),
+        TOTAL(CASE WHEN product = 'D' THEN net_pnl END),
+        COUNT(CASE WHEN product = 'D' THEN 1 END),
+        COUNT(CASE WHEN product = 'D' AND net_pnl > 0 THEN 1 END),
+        COUNT(CASE WHEN product = 'D' AND net_pnl < 0 THEN 1 END),
+        TOTAL(CASE WHEN net_pnl > 0 THEN net_pnl END),
+        TOTAL(CASE WHEN net_pnl < 0 THEN -net_pnl END)
+    FROM trades
+    WHERE status = 'CLOSED' AND entry_time_ms >= ? AND entry_time_ms < ?
+"""
 
-class ExitReason(Enum):
-    TARGET = "TARGET"
-    STOP_LOSS = "STOP_LOSS"
-    MANUAL = "MANUAL"
-    EOD_SQUAREOFF = "EOD_SQUAREOFF"
-    TRAILING_STOP = "TRAILING_STOP"
+# Columns (and Arrow type aliases) of the columnar closed-trade export
+_ARROW_SCHEMA = (
+    ("trade_id", "string"), ("symbol", "string"), ("strategy", "string"),
+    ("product", "string"), ("direction", "string"), ("exit_reason", "string"),
+    ("entry_time_ms", "int64"), ("exit_time_ms", "int64"),
+    ("entry_price", "float64"), ("exit_price", "float64"), ("quantity", "int64"),
+    ("gross_pnl", "float64"), ("brokerage", "float64"), ("net_pnl", "float64"),
+    ("pnl_percent", "float64"), ("mae", "float64"), ("mfe", "float64"),
+    ("holding_minutes", "int64"), ("confidence", "float64"),
+)
 
+_SQL_ARROW_CLOSED = (
+    f"SELECT {', '.join(name for name, _ in _ARROW_SCHEMA)} "
+    "FROM trades WHERE status = 'CLOSED' ORDER BY entry_time_ms"
+)
 
-@dataclass
+# Changes whenever a trade is closed or a closed row is rewritten
+_SQL_CLOSED_VERSION = "SELECT MAX(updated_at), COUNT(*) FROM trades WHERE status = 'CLOSED'"
+
+# Distinct SQL texts kept parsed in the connection's statement cache
+_STATEMENT_CACHE_SIZE = 256
+
+
+@dataclass(slots=True)
 class Trade:
     """Complete trade record with all lifecycle data"""
     # Identity
@@ -60,7 +165,7 @@ class Trade:
     # Exit
     exit_time: Optional[datetime] = None
     exit_price: Optional[float] = None
-    exit_reason: Optional[str] = None
+    exit_reason: Optional[str] = None  # TARGET/STOP_LOSS/MANUAL/EOD_SQUAREOFF/TRAILING_STOP
 
     # P&L
     gross_pnl: float = 0.0
@@ -84,30 +189,91 @@ class Trade:
     sl_order_id: Optional[str] = None
 
     # Status
-    status: str = "OPEN"
+    status: str = "OPEN"  # 'OPEN' or 'CLOSED'
+
+    # Derived at construction (not persisted): position value and capital it ties up
+    notional: float = field(init=False, repr=False, compare=False)
+    margin_used: float = field(init=False, repr=False, compare=False)
+    # Sector tag, filled on first use by RiskManager (symbol never changes)
+    sector: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.notional = self.entry_price * self.quantity
+        # Intraday with 5x margin
+        self.margin_used = self.notional / 5.0 if self.product == "I" else self.notional
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization"""
-        d = asdict(self)
-        # Convert datetime to ISO format
-        if isinstance(d['entry_time'], datetime):
-            d['entry_time'] = d['entry_time'].isoformat()
-        if d['exit_time'] and isinstance(d['exit_time'], datetime):
-            d['exit_time'] = d['exit_time'].isoformat()
-        return d
+        entry_time = self.entry_time
+        exit_time = self.exit_time
+        return {
+            'trade_id': self.trade_id,
+            'symbol': self.symbol,
+            'strategy': self.strategy,
+            'entry_time': entry_time.isoformat() if isinstance(entry_time, datetime) else entry_time,
+            'entry_price': self.entry_price,
+            'quantity': self.quantity,
+            'product': self.product,
+            'direction': self.direction,
+            'stop_loss': self.stop_loss,
+            'target': self.target,
+            'risk_amount': self.risk_amount,
+            'exit_time': exit_time.isoformat() if isinstance(exit_time, datetime) else exit_time,
+            'exit_price': self.exit_price,
+            'exit_reason': self.exit_reason,
+            'gross_pnl': self.gross_pnl,
+            'brokerage': self.brokerage,
+            'net_pnl': self.net_pnl,
+            'pnl_percent': self.pnl_percent,
+            'mae': self.mae,
+            'mfe': self.mfe,
+            'holding_minutes': self.holding_minutes,
+            'news_score': self.news_score,
+            'tech_score': self.tech_score,
+            'confidence': self.confidence,
+            'entry_order_id': self.entry_order_id,
+            'target_order_id': self.target_order_id,
+            'sl_order_id': self.sl_order_id,
+            'status': self.status,
+        }
 
     @classmethod
     def from_dict(cls, d: dict) -> 'Trade':
-        """Create Trade from dictionary"""
+        """Create Trade from dictionary (unknown keys are ignored)"""
+        d = {k: v for k, v in d.items() if k in _TRADE_FIELD_NAMES}
         # Convert ISO strings back to datetime
-        if isinstance(d['entry_time'], str):
-            d['entry_time'] = datetime.fromisoformat(d['entry_time'])
-        if d.get('exit_time') and isinstance(d['exit_time'], str):
-            d['exit_time'] = datetime.fromisoformat(d['exit_time'])
+        entry_time = d['entry_time']
+        if type(entry_time) is str:
+            d['entry_time'] = _parse_timestamp(entry_time)
+        exit_time = d.get('exit_time')
+        if type(exit_time) is str:
+            d['exit_time'] = _parse_timestamp(exit_time) if exit_time else None
         return cls(**d)
 
+    @classmethod
+    def from_row_fast(cls, row) -> 'Trade':
+        """Create Trade positionally from a row selected with _TRADE_COLUMNS"""
+        values = list(row)
+        values[_ENTRY_TIME_POS] = _parse_timestamp(values[_ENTRY_TIME_POS])
+        exit_time = values[_EXIT_TIME_POS]
+        values[_EXIT_TIME_POS] = _parse_timestamp(exit_time) if exit_time else None
+        return cls(*values)
+
 
-@dataclass
+# Field order known at class-definition time: drives positional construction
+# (init=False fields are derived, not columns)
+_TRADE_FIELDS = tuple(f.name for f in fields(Trade) if f.init)
+_TRADE_FIELD_NAMES = frozenset(_TRADE_FIELDS)
+_TRADE_COLUMNS = ", ".join(_TRADE_FIELDS)
+_ENTRY_TIME_POS = _TRADE_FIELDS.index('entry_time')
+_EXIT_TIME_POS = _TRADE_FIELDS.index('exit_time')
+
+_SQL_GET_TRADE = f"SELECT {_TRADE_COLUMNS} FROM trades WHERE trade_id = ?"
+
+_SQL_GET_OPEN_TRADES = f"SELECT {_TRADE_COLUMNS} FROM trades WHERE status = 'OPEN' ORDER BY entry_time DESC"
+
+
+@dataclass(slots=True)
 class Portfolio:
     """Daily portfolio snapshot"""
     date: date
@@ -146,10 +312,29 @@ class Portfolio:
 
     def to_dict(self) -> dict:
         """Convert to dictionary"""
-        d = asdict(self)
-        if isinstance(d['date'], date):
-            d['date'] = d['date'].isoformat()
-        return d
+        return {
+            'date': self.date.isoformat() if isinstance(self.date, date) else self.date,
+            'starting_capital': self.starting_capital,
+            'available_capital': self.available_capital,
+            'deployed_capital': self.deployed_capital,
+            'realized_pnl': self.realized_pnl,
+            'unrealized_pnl': self.unrealized_pnl,
+            'total_pnl': self.total_pnl,
+            'intraday_pnl': self.intraday_pnl,
+            'intraday_trades': self.intraday_trades,
+            'intraday_wins': self.intraday_wins,
+            'intraday_losses': self.intraday_losses,
+            'swing_pnl': self.swing_pnl,
+            'swing_trades': self.swing_trades,
+            'swing_wins': self.swing_wins,
+            'swing_losses': self.swing_losses,
+            'max_drawdown': self.max_drawdown,
+            'current_drawdown': self.current_drawdown,
+            'portfolio_heat': self.portfolio_heat,
+            'win_rate': self.win_rate,
+            'profit_factor': self.profit_factor,
+            'sharpe_ratio': self.sharpe_ratio,
+        }
 
 
 class PnLEngine:
@@ -158,12 +343,67 @@ class PnLEngine:
     def __init__(self, db_path: str = "./data/tradego.db"):
         self.db_path = db_path
         self.conn = None
+        # Open trades kept in memory; create/close/update keep it current, and
+        # PRAGMA data_version tells us when another process (dashboard) wrote
+        self._open_cache: Optional[Dict[str, Trade]] = None
+        self._data_version = None
+        # Capital tied up per product by open trades (margin for 'I', notional for 'D'),
+        # adjusted on open/close and recomputed whenever the open cache reloads
+        self._deployed: Dict[str, float] = {}
+        # Sum of risk_amount over open trades (portfolio heat in rupees), maintained the same way
+        self._open_heat = 0.0
+        # Column arrays over open trades for vectorized MAE/MFE updates (built lazily)
+        self._open = None
+        # (closed-trades version, pyarrow.Table) for export_closed_trades_arrow
+        self._arrow_cache = None
+        # WAL allows concurrent readers but still needs serialized writers: self.conn is
+        # the single writer (under _write_lock), each reader thread gets its own connection
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: Set[sqlite3.Connection] = set()
+        self._readers_lock = threading.RLock()
         self._ensure_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the engine's per-connection PRAGMAs"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=_STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA foreign_keys=OFF")
+        return conn
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """This thread's read-only connection (reads run lock-free alongside the writer)"""
+        reader = getattr(self._local, 'reader', None)
+        if reader is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            reader = _Reader(conn)
+            # Close the connection when its thread ends - the dashboard serves every
+            # request on a fresh thread, so connections must not outlive them
+            weakref.finalize(reader, self._release_reader, conn)
+            with self._readers_lock:
+                self._readers.add(conn)
+            self._local.reader = reader
+        return reader.conn
+
+    def _release_reader(self, conn: sqlite3.Connection):
+        """Close a reader connection whose thread has exited"""
+        with self._readers_lock:
+            self._readers.discard(conn)
+        conn.close()
+
     def _ensure_database(self):
         """Create database and tables if they don't exist"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.conn = self._connect()
+
+        # WAL + relaxed fsync: commits append to the log, fsync only at checkpoints
+        # (journal_mode is persistent in the file, so reader connections inherit it)
+        self.conn.execute("PRAGMA journal_mode=WAL")
 
         # Create trades table
         self.conn.execute("""
@@ -260,11 +500,47 @@ class PnLEngine:
             )
         """)
 
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_xinfo(trades)")}
+
+        # Integer epoch-ms timestamps for numeric range queries (ISO text kept for display)
+        if 'entry_time_ms' not in columns:
+            self.conn.execute("ALTER TABLE trades ADD COLUMN entry_time_ms INTEGER")
+            self.conn.execute("ALTER TABLE trades ADD COLUMN exit_time_ms INTEGER")
+            self.conn.executemany(
+                "UPDATE trades SET entry_time_ms = ?, exit_time_ms = ? WHERE trade_id = ?",
+                [
+                    (_to_ms(datetime.fromisoformat(row['entry_time'])),
+                     _to_ms(datetime.fromisoformat(row['exit_time'])) if row['exit_time'] else None,
+                     row['trade_id'])
+                    for row in self.conn.execute("SELECT trade_id, entry_time, exit_time FROM trades")
+                ]
+            )
+
+        # Margin-adjusted capital (intraday at 5x); ADD COLUMN only allows VIRTUAL
+        if 'capital_used' not in columns:
+            self.conn.execute(
+                "ALTER TABLE trades ADD COLUMN capital_used REAL "
+                "GENERATED ALWAYS AS (entry_price * quantity / CASE product WHEN 'I' THEN 5.0 ELSE 1.0 END) VIRTUAL"
+            )
+
         # Create indexes
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_strategy ON trades(strategy)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_entry_time ON trades(entry_time)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_entry_ms ON trades(entry_time_ms, status)")
+
+        # Composite indexes matching get_open_trades/get_trades predicates + ordering
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_status_entry ON trades(status, entry_time DESC)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_status_strategy_entry ON trades(status, strategy, entry_time)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_status_product_entry ON trades(status, product, entry_time)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_closed_netpnl ON trades(status, net_pnl) WHERE status = 'CLOSED'")
+
+        # OPEN is a handful of rows against a growing CLOSED history: keep them in their own tiny indexes
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_open ON trades(entry_time DESC) WHERE status = 'OPEN'")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_open_by_symbol ON trades(symbol) WHERE status = 'OPEN'")
+
+        # Superseded by idx_trades_status_entry (status is its leading column)
+        self.conn.execute("DROP INDEX IF EXISTS idx_trades_status")
 
         self.conn.commit()
         logger.info(f"Database initialized at {self.db_path}")
@@ -287,14 +563,15 @@ class PnLEngine:
                     sl_order_id: str = None) -> Trade:
         """Create a new trade entry"""
 
-        # Generate unique trade ID
-        trade_id = f"{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Generate unique trade ID (microseconds: same-symbol fills within a second don't collide)
+        entry_time = datetime.now()
+        trade_id = f"{symbol}_{entry_time.strftime('%Y%m%d_%H%M%S_%f')}"
 
         trade = Trade(
             trade_id=trade_id,
             symbol=symbol,
             strategy=strategy,
-            entry_time=datetime.now(),
+            entry_time=entry_time,
             entry_price=entry_price,
             quantity=quantity,
             product=product,
@@ -312,54 +589,99 @@ class PnLEngine:
         )
 
         # Insert into database
-        self.conn.execute("""
-            INSERT INTO trades (
-                trade_id, symbol, strategy, entry_time, entry_price, quantity,
-                product, direction, stop_loss, target, risk_amount,
-                news_score, tech_score, confidence,
-                entry_order_id, target_order_id, sl_order_id, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            trade.trade_id, trade.symbol, trade.strategy,
-            trade.entry_time.isoformat(), trade.entry_price, trade.quantity,
-            trade.product, trade.direction, trade.stop_loss, trade.target,
-            trade.risk_amount, trade.news_score, trade.tech_score,
-            trade.confidence, trade.entry_order_id, trade.target_order_id,
-            trade.sl_order_id, trade.status
-        ))
-        self.conn.commit()
+        self.create_trades_bulk([trade])
 
         logger.info(f"Created trade: {trade_id} | {symbol} {direction} {quantity} @ {entry_price}")
         return trade
 
-    def update_position(self, trade_id: str, current_price: float) -> None:
-        """Update MAE/MFE and unrealized P&L for open position"""
-
-        trade = self.get_trade(trade_id)
-        if not trade or trade.status != "OPEN":
+    def create_trades_bulk(self, trades: List[Trade]) -> None:
+        """Insert many trades in one transaction (backfill / reconciliation replays)"""
+        if not trades:
             return
 
-        # Calculate unrealized P&L
-        if trade.direction == "BUY":
-            unrealized_pnl = (current_price - trade.entry_price) * trade.quantity
-        else:
-            unrealized_pnl = (trade.entry_price - current_price) * trade.quantity
+        with self._write_lock:
+            with self.conn:
+                self.conn.executemany(_SQL_INSERT_TRADE, (
+                    (
+                        t.trade_id, t.symbol, t.strategy,
+                        t.entry_time.isoformat(), t.entry_price, t.quantity,
+                        t.product, t.direction, t.stop_loss, t.target,
+                        t.risk_amount, t.news_score, t.tech_score,
+                        t.confidence, t.entry_order_id, t.target_order_id,
+                        t.sl_order_id, t.status, _to_ms(t.entry_time),
+                        t.exit_time.isoformat() if t.exit_time else None,
+                        _to_ms(t.exit_time) if t.exit_time else None,
+                        t.exit_price, t.exit_reason,
+                        t.gross_pnl, t.brokerage, t.net_pnl, t.pnl_percent,
+                        t.mae, t.mfe, t.holding_minutes
+                    )
+                    for t in trades
+                ))
+
+            # Only touch the in-memory book once the insert is committed - a failed
+            # batch must not leave phantom open trades holding capital and heat
+            self._open = None
+            if self._open_cache is not None:
+                for t in trades:
+                    if t.status == "OPEN" and t.trade_id not in self._open_cache:
+                        self._open_cache[t.trade_id] = t
+                        self._deployed[t.product] = self._deployed.get(t.product, 0.0) + t.margin_used
+                        self._open_heat += t.risk_amount
 
-        # Update MAE (Maximum Adverse Excursion)
-        if unrealized_pnl < trade.mae:
-            trade.mae = unrealized_pnl
+    def update_position(self, trade_id: str, current_price: float) -> None:
+        """Update MAE/MFE and unrealized P&L for open position"""
+        self.update_positions_bulk([(trade_id, current_price)])
 
-        # Update MFE (Maximum Favorable Excursion)
-        if unrealized_pnl > trade.mfe:
-            trade.mfe = unrealized_pnl
+    def update_positions_bulk(self, updates: List[Tuple[str, float]]) -> None:
+        """Update MAE/MFE for many open positions in one transaction"""
+        if not updates:
+            return
 
-        # Update in database
-        self.conn.execute("""
-            UPDATE trades
-            SET mae = ?, mfe = ?, updated_at = ?
-            WHERE trade_id = ?
-        """, (trade.mae, trade.mfe, datetime.now().isoformat(), trade_id))
-        self.conn.commit()
+        with self._write_lock:
+            soa = self._open_arrays()
+            pairs = [(soa['index'][tid], price) for tid, price in updates if tid in soa['index']]
+            if not pairs:
+                return
+
+            rows = np.fromiter((i for i, _ in pairs), dtype=np.int64, count=len(pairs))
+            prices = np.fromiter((p for _, p in pairs), dtype=np.float64, count=len(pairs))
+
+            # Unrealized P&L for every updated position at once, then fold into MAE/MFE
+            upnl = (prices - soa['entry_price'][rows]) * soa['sign'][rows] * soa['qty'][rows]
+            np.minimum.at(soa['mae'], rows, upnl)
+            np.maximum.at(soa['mfe'], rows, upnl)
+
+            touched = np.unique(rows)
+            for i in touched:
+                trade = self._open_cache.get(soa['trade_id'][i])
+                if trade:
+                    trade.mae = float(soa['mae'][i])
+                    trade.mfe = float(soa['mfe'][i])
+
+            now = datetime.now().isoformat()
+            with self.conn:
+                self.conn.executemany(_SQL_UPDATE_MAE_MFE, (
+                    {'trade_id': soa['trade_id'][i], 'mae': float(soa['mae'][i]),
+                     'mfe': float(soa['mfe'][i]), 'now': now}
+                    for i in touched
+                ))
+
+    def _open_arrays(self) -> Dict[str, object]:
+        """Open trades as column arrays (trade_id -> row index in 'index')"""
+        self._sync_open_cache()
+        if self._open is None:
+            trades = list(self._open_cache.values())
+            n = len(trades)
+            self._open = {
+                'trade_id': [t.trade_id for t in trades],
+                'index': {t.trade_id: i for i, t in enumerate(trades)},
+                'entry_price': np.fromiter((t.entry_price for t in trades), dtype=np.float64, count=n),
+                'qty': np.fromiter((t.quantity for t in trades), dtype=np.int64, count=n),
+                'sign': np.fromiter((_DIRECTION_SIGN.get(t.direction, 1) for t in trades), dtype=np.int8, count=n),
+                'mae': np.fromiter((t.mae for t in trades), dtype=np.float64, count=n),
+                'mfe': np.fromiter((t.mfe for t in trades), dtype=np.float64, count=n),
+            }
+        return self._open
 
     def close_trade(self,
                    trade_id: str,
@@ -377,61 +699,108 @@ class PnLEngine:
             return trade
 
         # Update trade
-        trade.exit_time = datetime.now()
+        exit_ms = _now_ms()
+        trade.exit_time = datetime.fromtimestamp(exit_ms / 1000)
         trade.exit_price = exit_price
         trade.exit_reason = exit_reason
         trade.status = "CLOSED"
 
         # Calculate holding time
-        trade.holding_minutes = int((trade.exit_time - trade.entry_time).total_seconds() / 60)
+        trade.holding_minutes = (exit_ms - _to_ms(trade.entry_time)) // 60_000
 
         # Calculate P&L
-        if trade.direction == "BUY":
-            trade.gross_pnl = (exit_price - trade.entry_price) * trade.quantity
-        else:
-            trade.gross_pnl = (trade.entry_price - exit_price) * trade.quantity
+        trade.gross_pnl = (exit_price - trade.entry_price) * trade.quantity * _DIRECTION_SIGN.get(trade.direction, 1)
 
         # Apply brokerage
         trade.brokerage = brokerage
         trade.net_pnl = trade.gross_pnl - brokerage
 
-        # Calculate P&L percentage
-        capital_used = trade.entry_price * trade.quantity
-        if trade.product == "I":  # Intraday with 5x margin
-            capital_used = capital_used / 5
-        trade.pnl_percent = (trade.net_pnl / capital_used) * 100 if capital_used > 0 else 0
-
-        # Update in database
-        self.conn.execute("""
-            UPDATE trades
-            SET exit_time = ?, exit_price = ?, exit_reason = ?,
-                gross_pnl = ?, brokerage = ?, net_pnl = ?, pnl_percent = ?,
-                holding_minutes = ?, status = ?, updated_at = ?
-            WHERE trade_id = ?
-        """, (
-            trade.exit_time.isoformat(), trade.exit_price, trade.exit_reason,
-            trade.gross_pnl, trade.brokerage, trade.net_pnl, trade.pnl_percent,
-            trade.holding_minutes, trade.status, datetime.now().isoformat(),
-            trade_id
-        ))
-        self.conn.commit()
+        # Update in database (pnl_percent computed against capital_used in SQL)
+        with self._write_lock:
+            with self.conn:
+                row = self.conn.execute(_SQL_CLOSE_TRADE, (
+                    trade.exit_time.isoformat(), exit_ms, trade.exit_price, trade.exit_reason,
+                    trade.gross_pnl, trade.brokerage, trade.net_pnl, trade.net_pnl,
+                    trade.holding_minutes, trade.status, datetime.now().isoformat(),
+                    trade_id
+                )).fetchone()
+
+            # Release capital and heat only once the close is committed - a failed
+            # write must leave the trade open in memory as it still is in the DB
+            self._open = None
+            if self._open_cache is not None and self._open_cache.pop(trade_id, None) is not None:
+                if self._open_cache:
+                    self._deployed[trade.product] = self._deployed.get(trade.product, 0.0) - trade.margin_used
+                    self._open_heat -= trade.risk_amount
+                else:
+                    # No open trades: drop accumulated float drift
+                    self._deployed = {}
+                    self._open_heat = 0.0
+        trade.pnl_percent = float(row['pnl_percent']) if row else 0.0
 
         logger.info(f"Closed trade: {trade_id} | P&L: ₹{trade.net_pnl:.2f} ({trade.pnl_percent:.2f}%) | Reason: {exit_reason}")
         return trade
 
     def get_trade(self, trade_id: str) -> Optional[Trade]:
         """Get trade by ID"""
-        cursor = self.conn.execute("SELECT * FROM trades WHERE trade_id = ?", (trade_id,))
+        cursor = self._get_conn().execute(_SQL_GET_TRADE, (trade_id,))
         row = cursor.fetchone()
         if not row:
             return None
         return self._row_to_trade(row)
 
     def get_open_trades(self) -> List[Trade]:
-        """Get all open trades"""
-        cursor = self.conn.execute("SELECT * FROM trades WHERE status = 'OPEN' ORDER BY entry_time DESC")
+        """Get all open trades (newest first) from the in-memory cache"""
+        with self._write_lock:
+            open_trades = list(self._sync_open_cache().values())
+        open_trades.sort(key=lambda t: t.entry_time, reverse=True)
+        return open_trades
+
+    def _sync_open_cache(self) -> Dict[str, Trade]:
+        """(Re)load the open-trade cache if empty or the DB was changed by another connection"""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._open_cache is None or version != self._data_version:
+            self._open_cache = {t.trade_id: t for t in self._load_open_trades_from_db()}
+            self._data_version = version
+            self._open = None
+            deployed: Dict[str, float] = {}
+            heat = 0.0
+            for t in self._open_cache.values():
+                deployed[t.product] = deployed.get(t.product, 0.0) + t.margin_used
+                heat += t.risk_amount
+            self._deployed = deployed
+            self._open_heat = heat
+        return self._open_cache
+
+    def get_current_heat(self) -> float:
+        """Total risk_amount of open trades in rupees (O(1): maintained incrementally)"""
+        with self._write_lock:
+            self._sync_open_cache()
+            return self._open_heat
+
+    def get_intraday_deployed(self) -> float:
+        """Margin held by open intraday trades (O(1): maintained incrementally)"""
+        with self._write_lock:
+            self._sync_open_cache()
+            return self._deployed.get("I", 0.0)
+
+    def get_swing_deployed(self) -> float:
+        """Capital held by open delivery/swing trades (O(1): maintained incrementally)"""
+        with self._write_lock:
+            self._sync_open_cache()
+            return self._deployed.get("D", 0.0)
+
+    def _load_open_trades_from_db(self) -> List[Trade]:
+        """Read all open trades from the database"""
+        cursor = self.conn.execute(_SQL_GET_OPEN_TRADES)
         return [self._row_to_trade(row) for row in cursor.fetchall()]
 
+    def reload(self) -> None:
+        """Drop in-memory caches so the next read goes to the database"""
+        with self._write_lock:
+            self._open_cache = None
+            self._open = None
+
     def get_trades(self,
                    days: int = None,
                    strategy: str = None,
@@ -441,18 +810,53 @@ class PnLEngine:
                    start_date: date = None,
                    end_date: date = None) -> List[Trade]:
         """Get trades with filters"""
-
-        query = "SELECT * FROM trades WHERE status = 'CLOSED'"
+        return list(self.iter_trades(days=days, strategy=strategy, symbol=symbol, outcome=outcome,
+                                     product=product, start_date=start_date, end_date=end_date))
+
+    def iter_trades(self,
+                    days: int = None,
+                    strategy: str = None,
+                    symbol: str = None,
+                    outcome: str = None,
+                    product: str = None,
+                    start_date: date = None,
+                    end_date: date = None,
+                    batch_size: int = 1000) -> Iterator[Trade]:
+        """Stream trades with filters, holding at most batch_size rows in memory"""
+        query, params = self._trades_query(days, strategy, symbol, outcome, product, start_date, end_date)
+        cursor = self._get_conn().execute(query, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield from map(self._row_to_trade, batch)
+
+    def get_trades_raw(self,
+                       days: int = None,
+                       strategy: str = None,
+                       symbol: str = None,
+                       outcome: str = None,
+                       product: str = None,
+                       start_date: date = None,
+                       end_date: date = None) -> List[sqlite3.Row]:
+        """Get closed trades as raw rows (read-only callers: no Trade/datetime construction)"""
+        query, params = self._trades_query(days, strategy, symbol, outcome, product, start_date, end_date)
+        return self._get_conn().execute(query, params).fetchall()
+
+    def _trades_query(self, days, strategy, symbol, outcome, product,
+                      start_date, end_date) -> Tuple[str, list]:
+        """Build the filtered closed-trades SELECT and its parameters"""
+        query = f"SELECT {_TRADE_COLUMNS} FROM trades WHERE status = 'CLOSED'"
         params = []
 
         if days:
             start_date = date.today() - timedelta(days=days)
-            query += " AND date(entry_time) >= ?"
-            params.append(start_date.isoformat())
+            query += " AND entry_time_ms >= ?"
+            params.append(_day_start_ms(start_date))
 
         if start_date and end_date:
-            query += " AND date(entry_time) BETWEEN ? AND ?"
-            params.extend([start_date.isoformat(), end_date.isoformat()])
+            query += " AND entry_time_ms >= ? AND entry_time_ms < ?"
+            params.extend([_day_start_ms(start_date), _day_start_ms(end_date + timedelta(days=1))])
 
         if strategy:
             query += " AND strategy = ?"
@@ -475,8 +879,7 @@ class PnLEngine:
 
         query += " ORDER BY entry_time DESC"
 
-        cursor = self.conn.execute(query, params)
-        return [self._row_to_trade(row) for row in cursor.fetchall()]
+        return query, params
 
     def get_daily_pnl(self, target_date: date = None) -> Portfolio:
         """Calculate daily portfolio metrics"""
@@ -484,43 +887,31 @@ class PnLEngine:
         if target_date is None:
             target_date = date.today()
 
-        # Get trades for the day
-        day_trades = self.get_trades(start_date=target_date, end_date=target_date)
+        # Aggregate the day's closed trades in SQL (no Trade objects needed)
+        (total_trades, realized_pnl,
+         intraday_pnl, intraday_count, intraday_wins, intraday_losses,
+         swing_pnl, swing_count, swing_wins, swing_losses,
+         total_wins, total_losses) = self._get_conn().execute(
+            _SQL_DAILY_AGG, (_day_start_ms(target_date), _day_start_ms(target_date + timedelta(days=1)))
+        ).fetchone()
         open_trades = self.get_open_trades()
 
         # Calculate metrics
-        realized_pnl = sum(t.net_pnl for t in day_trades)
         unrealized_pnl = sum(self._calculate_unrealized_pnl(t) for t in open_trades)
         total_pnl = realized_pnl + unrealized_pnl
 
-        # Intraday metrics
-        intraday_trades = [t for t in day_trades if t.product == "I"]
-        intraday_pnl = sum(t.net_pnl for t in intraday_trades)
-        intraday_wins = len([t for t in intraday_trades if t.net_pnl > 0])
-        intraday_losses = len([t for t in intraday_trades if t.net_pnl < 0])
-
-        # Swing metrics
-        swing_trades = [t for t in day_trades if t.product == "D"]
-        swing_pnl = sum(t.net_pnl for t in swing_trades)
-        swing_wins = len([t for t in swing_trades if t.net_pnl > 0])
-        swing_losses = len([t for t in swing_trades if t.net_pnl < 0])
-
         # Capital calculation
         starting_capital = 1000000  # ₹10 lakh (should come from config)
-        deployed_capital = sum(t.entry_price * t.quantity / (5 if t.product == "I" else 1)
-                              for t in open_trades)
+        deployed_capital = self.get_intraday_deployed() + self.get_swing_deployed()
         available_capital = starting_capital - deployed_capital
 
         # Risk metrics
-        portfolio_heat = sum(t.risk_amount for t in open_trades) / starting_capital * 100
+        portfolio_heat = self.get_current_heat() / starting_capital * 100
 
         # Performance metrics
-        total_trades = len(day_trades)
         win_rate = ((intraday_wins + swing_wins) / total_trades * 100) if total_trades > 0 else 0.0
 
         # Profit factor
-        total_wins = sum(t.net_pnl for t in day_trades if t.net_pnl > 0)
-        total_losses = abs(sum(t.net_pnl for t in day_trades if t.net_pnl < 0))
         profit_factor = (total_wins / total_losses) if total_losses > 0 else 0.0
 
         portfolio = Portfolio(
@@ -532,11 +923,11 @@ class PnLEngine:
             unrealized_pnl=unrealized_pnl,
             total_pnl=total_pnl,
             intraday_pnl=intraday_pnl,
-            intraday_trades=len(intraday_trades),
+            intraday_trades=intraday_count,
             intraday_wins=intraday_wins,
             intraday_losses=intraday_losses,
             swing_pnl=swing_pnl,
-            swing_trades=len(swing_trades),
+            swing_trades=swing_count,
             swing_wins=swing_wins,
             swing_losses=swing_losses,
             max_drawdown=0.0,  # TODO: Calculate
@@ -560,76 +951,62 @@ class PnLEngine:
 
     def _save_daily_portfolio(self, portfolio: Portfolio):
         """Save or update daily portfolio snapshot"""
-        self.conn.execute("""
-            INSERT OR REPLACE INTO daily_portfolio (
-                date, starting_capital, available_capital, deployed_capital,
-                realized_pnl, unrealized_pnl, total_pnl,
-                intraday_pnl, intraday_trades, intraday_wins, intraday_losses,
-                swing_pnl, swing_trades, swing_wins, swing_losses,
-                max_drawdown, current_drawdown, portfolio_heat,
-                win_rate, profit_factor, sharpe_ratio, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            portfolio.date.isoformat(),
-            portfolio.starting_capital,
-            portfolio.available_capital,
-            portfolio.deployed_capital,
-            portfolio.realized_pnl,
-            portfolio.unrealized_pnl,
-            portfolio.total_pnl,
-            portfolio.intraday_pnl,
-            portfolio.intraday_trades,
-            portfolio.intraday_wins,
-            portfolio.intraday_losses,
-            portfolio.swing_pnl,
-            portfolio.swing_trades,
-            portfolio.swing_wins,
-            portfolio.swing_losses,
-            portfolio.max_drawdown,
-            portfolio.current_drawdown,
-            portfolio.portfolio_heat,
-            portfolio.win_rate,
-            portfolio.profit_factor,
-            portfolio.sharpe_ratio,
-            datetime.now().isoformat()
-        ))
-        self.conn.commit()
+        with self._write_lock:
+            self.conn.execute(_SQL_UPSERT_PORTFOLIO, (
+                portfolio.date.isoformat(),
+                portfolio.starting_capital,
+                portfolio.available_capital,
+                portfolio.deployed_capital,
+                portfolio.realized_pnl,
+                portfolio.unrealized_pnl,
+                portfolio.total_pnl,
+                portfolio.intraday_pnl,
+                portfolio.intraday_trades,
+                portfolio.intraday_wins,
+                portfolio.intraday_losses,
+                portfolio.swing_pnl,
+                portfolio.swing_trades,
+                portfolio.swing_wins,
+                portfolio.swing_losses,
+                portfolio.max_drawdown,
+                portfolio.current_drawdown,
+                portfolio.portfolio_heat,
+                portfolio.win_rate,
+                portfolio.profit_factor,
+                portfolio.sharpe_ratio,
+                datetime.now().isoformat()
+            ))
+            self.conn.commit()
 
     def _row_to_trade(self, row) -> Trade:
-        """Convert database row to Trade object"""
-        return Trade(
-            trade_id=row['trade_id'],
-            symbol=row['symbol'],
-            strategy=row['strategy'],
-            entry_time=datetime.fromisoformat(row['entry_time']),
-            entry_price=row['entry_price'],
-            quantity=row['quantity'],
-            product=row['product'],
-            direction=row['direction'],
-            stop_loss=row['stop_loss'],
-            target=row['target'],
-            risk_amount=row['risk_amount'],
-            exit_time=datetime.fromisoformat(row['exit_time']) if row['exit_time'] else None,
-            exit_price=row['exit_price'],
-            exit_reason=row['exit_reason'],
-            gross_pnl=row['gross_pnl'],
-            brokerage=row['brokerage'],
-            net_pnl=row['net_pnl'],
-            pnl_percent=row['pnl_percent'],
-            mae=row['mae'],
-            mfe=row['mfe'],
-            holding_minutes=row['holding_minutes'],
-            news_score=row['news_score'],
-            tech_score=row['tech_score'],
-            confidence=row['confidence'],
-            entry_order_id=row['entry_order_id'],
-            target_order_id=row['target_order_id'],
-            sl_order_id=row['sl_order_id'],
-            status=row['status']
+        """Convert database row (selected with _TRADE_COLUMNS) to Trade object"""
+        return Trade.from_row_fast(row)
+
+    def export_closed_trades_arrow(self) -> 'pa.Table':
+        """Closed-trade history as a columnar Arrow table (cached until a closed trade changes)"""
+        if not _HAS_PYARROW:
+            raise RuntimeError("pyarrow is required for export_closed_trades_arrow")
+
+        conn = self._get_conn()
+        key = tuple(conn.execute(_SQL_CLOSED_VERSION).fetchone())
+        if self._arrow_cache is not None and self._arrow_cache[0] == key:
+            return self._arrow_cache[1]
+
+        rows = conn.execute(_SQL_ARROW_CLOSED).fetchall()
+        columns = list(zip(*rows)) if rows else [()] * len(_ARROW_SCHEMA)
+        table = pa.Table.from_arrays(
+            [pa.array(col, type=pa.type_for_alias(typ)) for col, (_, typ) in zip(columns, _ARROW_SCHEMA)],
+            names=[name for name, _ in _ARROW_SCHEMA]
         )
+        self._arrow_cache = (key, table)
+        return table
 
     def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
         if self.conn:
             self.conn.close()
 
@@ -679,6 +1056,18 @@ if __name__ == "__main__":
     print(f"   Entry: {trade.quantity} shares @ ₹{trade.entry_price}")
     print(f"   Risk: ₹{trade.risk_amount} | Target: ₹{trade.target} | SL: ₹{trade.stop_loss}")
 
+    # Bulk insert (e.g. backfilling trades from a broker order book)
+    backfill = [
+        Trade(trade_id=f"BACKFILL_{sym}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+              symbol=f"NSE_EQ|{sym}-EQ", strategy="mean_reversion",
+              entry_time=datetime.now(), entry_price=price, quantity=10,
+              product="D", direction="BUY", stop_loss=price * 0.98,
+              target=price * 1.03, risk_amount=price * 0.2)
+        for sym, price in [("TCS", 3500.0), ("INFY", 1500.0)]
+    ]
+    engine.create_trades_bulk(backfill)
+    print(f"\n📥 Bulk inserted {len(backfill)} trades")
+
     # Simulate price movement
     engine.update_position(trade.trade_id, 2530.0)  # Price goes up
     print(f"\n📈 Price moved to ₹2530")
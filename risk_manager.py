@@ -4,18 +4,136 @@ Handles position sizing, portfolio limits, correlation checks, circuit breakers
 """
 
 import logging
+import sys
 from typing import List, Optional, Dict, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
 import numpy as np
 
+# JIT-compiled correlation scan (optional, falls back to a vectorized NumPy scan)
+try:
+    import numba
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 from data_layer import Signal, get_data_layer
 from pnl_engine import get_pnl_engine, Trade, Portfolio
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _first_correlated_loop(returns: np.ndarray, threshold: float, min_periods: int) -> tuple:
+    """
+    Pearson correlation of row 0 against rows 1..N of a tail-aligned returns matrix,
+    each pair over the bars finite in both rows (NaN marks a missing bar),
+    stopping at the first |corr| > threshold
+    Pairs with fewer than min_periods common bars are skipped
+    Returns (row index, corr) or (-1, 0.0); flat series count as uncorrelated
+    """
+    n, t = returns.shape
+    r0 = returns[0]
+    for i in range(1, n):
+        ri = returns[i]
+        count = 0
+        sum0 = 0.0
+        sumi = 0.0
+        for k in range(t):
+            if np.isfinite(r0[k]) and np.isfinite(ri[k]):
+                count += 1
+                sum0 += r0[k]
+                sumi += ri[k]
+        if count < min_periods:
+            continue
+        mean0 = sum0 / count
+        meani = sumi / count
+        cov = 0.0
+        var0 = 0.0
+        vari = 0.0
+        for k in range(t):
+            if np.isfinite(r0[k]) and np.isfinite(ri[k]):
+                d0 = r0[k] - mean0
+                di = ri[k] - meani
+                cov += d0 * di
+                var0 += d0 * d0
+                vari += di * di
+        denom = np.sqrt(var0 * vari)
+        c = cov / denom if denom > 0 else 0.0
+        if abs(c) > threshold:
+            return i, c
+    return -1, 0.0
+
+
+def _first_correlated_numpy(returns: np.ndarray, threshold: float, min_periods: int) -> tuple:
+    """Vectorized equivalent of _first_correlated_loop: every pair in one masked pass"""
+    r0 = returns[0]
+    rest = returns[1:]
+    mask = np.isfinite(rest) & np.isfinite(r0)
+    counts = mask.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x0 = np.where(mask, r0, 0.0)
+        xi = np.where(mask, rest, 0.0)
+        d0 = np.where(mask, x0 - (x0.sum(axis=1) / counts)[:, None], 0.0)
+        di = np.where(mask, xi - (xi.sum(axis=1) / counts)[:, None], 0.0)
+        denom = np.sqrt((d0 * d0).sum(axis=1) * (di * di).sum(axis=1))
+        correlations = np.where(denom > 0, (d0 * di).sum(axis=1) / denom, 0.0)
+    correlations[counts < min_periods] = 0.0
+    hits = np.flatnonzero(np.abs(correlations) > threshold)
+    if hits.size == 0:
+        return -1, 0.0
+    return int(hits[0]) + 1, float(correlations[hits[0]])
+
+
+_first_correlated = numba.njit(cache=True)(_first_correlated_loop) if _HAS_NUMBA else _first_correlated_numpy
+
+
+# Sector mapping (simplified)
+_SECTOR_MAP = {
+    'RELIANCE': 'Energy', 'ONGC': 'Energy', 'BPCL': 'Energy', 'NTPC': 'Energy',
+    'POWERGRID': 'Energy', 'TATAPOWER': 'Energy', 'ADANIGREEN': 'Energy',
+    'ADANIPWR': 'Energy', 'COALINDIA': 'Energy',
+
+    'TCS': 'IT', 'INFY': 'IT', 'WIPRO': 'IT', 'HCLTECH': 'IT', 'TECHM': 'IT',
+
+    'HDFCBANK': 'Banking', 'ICICIBANK': 'Banking', 'SBIN': 'Banking',
+    'AXISBANK': 'Banking', 'KOTAKBANK': 'Banking', 'INDUSINDBK': 'Banking',
+
+    'BAJFINANCE': 'Financial', 'BAJAJFINSV': 'Financial', 'SBILIFE': 'Financial',
+    'HDFCLIFE': 'Financial', 'MUTHOOTFIN': 'Financial',
+
+    'BHARTIARTL': 'Telecom', 'INDUSTOWER': 'Telecom',
+
+    'MARUTI': 'Auto', 'TATAMOTORS': 'Auto', 'BAJAJ-AUTO': 'Auto',
+    'HEROMOTOCO': 'Auto', 'EICHERMOT': 'Auto', 'M&M': 'Auto',
+
+    'SUNPHARMA': 'Pharma', 'DRREDDY': 'Pharma', 'CIPLA': 'Pharma',
+    'LUPIN': 'Pharma', 'DIVISLAB': 'Pharma', 'TORNTPHARM': 'Pharma',
+    'APOLLOHOSP': 'Pharma',
+
+    'TATASTEEL': 'Metals', 'JSWSTEEL': 'Metals', 'HINDALCO': 'Metals',
+    'VEDL': 'Metals', 'SAIL': 'Metals', 'NMDC': 'Metals',
+
+    'HINDUNILVR': 'FMCG', 'ITC': 'FMCG', 'NESTLEIND': 'FMCG',
+    'BRITANNIA': 'FMCG', 'DABUR': 'FMCG', 'MARICO': 'FMCG',
+    'GODREJCP': 'FMCG', 'TATACONSUM': 'FMCG',
+
+    'LT': 'Infrastructure', 'ULTRACEMCO': 'Infrastructure',
+    'GRASIM': 'Infrastructure', 'SHREECEM': 'Infrastructure',
+    'ADANIPORTS': 'Infrastructure', 'CONCOR': 'Infrastructure',
+
+    'ASIANPAINT': 'Materials', 'BERGEPAINT': 'Materials',
+    'PIDILITIND': 'Materials',
+
+    'TITAN': 'Retail', 'INDIGO': 'Retail', 'PAGEIND': 'Retail',
+    'VOLTAS': 'Retail', 'HAVELLS': 'Retail'
+}
+
+# Instrument key -> sector: pre-seeded with interned NSE_EQ|SYMBOL-EQ keys (identity hits for
+# interned Signal symbols), other key forms memoised by RiskManager.get_sector on first use
+_SECTOR_BY_KEY: Dict[str, str] = {sys.intern(f"NSE_EQ|{name}-EQ"): sector for name, sector in _SECTOR_MAP.items()}
+
+
+@dataclass(slots=True)
 class PositionSize:
     """Position sizing result"""
     quantity: int
@@ -25,9 +143,9 @@ class PositionSize:
     capital_required: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RiskLimits:
-    """Portfolio risk configuration"""
+    """Portfolio risk configuration (immutable; rupee caps derived once)"""
     # Capital allocation
     total_capital: float = 1_000_000  # ₹10 lakh
     intraday_allocation: float = 0.70  # 70%
@@ -52,55 +170,44 @@ class RiskLimits:
     # Correlation
     max_correlation: float = 0.7  # Reject if correlation > 0.7
 
+    # Derived rupee caps (set in __post_init__)
+    intraday_cap: float = field(init=False, repr=False)
+    swing_cap: float = field(init=False, repr=False)
+    heat_cap: float = field(init=False, repr=False)
+    deployed_cap: float = field(init=False, repr=False)
+    daily_loss_cap: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        capital = self.total_capital
+        object.__setattr__(self, 'intraday_cap', capital * self.intraday_allocation)
+        object.__setattr__(self, 'swing_cap', capital * self.swing_allocation)
+        object.__setattr__(self, 'heat_cap', capital * self.max_portfolio_heat)
+        object.__setattr__(self, 'deployed_cap', capital * self.max_capital_deployed)
+        object.__setattr__(self, 'daily_loss_cap', capital * self.max_daily_loss_percent)
+
 
 class RiskManager:
     """Manage portfolio and per-trade risk"""
 
     # Sector mapping (simplified)
-    SECTOR_MAP = {
-        'RELIANCE': 'Energy', 'ONGC': 'Energy', 'BPCL': 'Energy', 'NTPC': 'Energy',
-        'POWERGRID': 'Energy', 'TATAPOWER': 'Energy', 'ADANIGREEN': 'Energy',
-        'ADANIPWR': 'Energy', 'COALINDIA': 'Energy',
-
-        'TCS': 'IT', 'INFY': 'IT', 'WIPRO': 'IT', 'HCLTECH': 'IT', 'TECHM': 'IT',
-
-        'HDFCBANK': 'Banking', 'ICICIBANK': 'Banking', 'SBIN': 'Banking',
-        'AXISBANK': 'Banking', 'KOTAKBANK': 'Banking', 'INDUSINDBK': 'Banking',
-
-        'BAJFINANCE': 'Financial', 'BAJAJFINSV': 'Financial', 'SBILIFE': 'Financial',
-        'HDFCLIFE': 'Financial', 'MUTHOOTFIN': 'Financial',
-
-        'BHARTIARTL': 'Telecom', 'INDUSTOWER': 'Telecom',
-
-        'MARUTI': 'Auto', 'TATAMOTORS': 'Auto', 'BAJAJ-AUTO': 'Auto',
-        'HEROMOTOCO': 'Auto', 'EICHERMOT': 'Auto', 'M&M': 'Auto',
-
-        'SUNPHARMA': 'Pharma', 'DRREDDY': 'Pharma', 'CIPLA': 'Pharma',
-        'LUPIN': 'Pharma', 'DIVISLAB': 'Pharma', 'TORNTPHARM': 'Pharma',
-        'APOLLOHOSP': 'Pharma',
-
-        'TATASTEEL': 'Metals', 'JSWSTEEL': 'Metals', 'HINDALCO': 'Metals',
-        'VEDL': 'Metals', 'SAIL': 'Metals', 'NMDC': 'Metals',
-
-        'HINDUNILVR': 'FMCG', 'ITC': 'FMCG', 'NESTLEIND': 'FMCG',
-        'BRITANNIA': 'FMCG', 'DABUR': 'FMCG', 'MARICO': 'FMCG',
-        'GODREJCP': 'FMCG', 'TATACONSUM': 'FMCG',
-
-        'LT': 'Infrastructure', 'ULTRACEMCO': 'Infrastructure',
-        'GRASIM': 'Infrastructure', 'SHREECEM': 'Infrastructure',
-        'ADANIPORTS': 'Infrastructure', 'CONCOR': 'Infrastructure',
-
-        'ASIANPAINT': 'Materials', 'BERGEPAINT': 'Materials',
-        'PIDILITIND': 'Materials',
-
-        'TITAN': 'Retail', 'INDIGO': 'Retail', 'PAGEIND': 'Retail',
-        'VOLTAS': 'Retail', 'HAVELLS': 'Retail'
-    }
+    SECTOR_MAP = _SECTOR_MAP
 
     def __init__(self, limits: RiskLimits = None):
         self.limits = limits or RiskLimits()
+        # Sizing constants derived from limits once, not per signal:
+        # risk% rises linearly from min_risk at 0.65 confidence to max_risk at 1.0
+        self._risk_slope = (self.limits.max_risk_per_trade - self.limits.min_risk_per_trade) / 0.35
+        self._risk_intercept = self.limits.min_risk_per_trade - 0.65 * self._risk_slope
+        self._max_pos_value = self.limits.total_capital * 0.10  # 10% of capital per position
+        self._intraday_margin_div = 5.0  # Intraday 5x leverage
+        self._min_rr_i = 1.5
+        self._min_rr_d = 1.2
         self.pnl_engine = get_pnl_engine()
         self.data_layer = get_data_layer()
+        # symbol -> (day, daily close-to-close returns); daily bars don't change intraday
+        self._returns_cache: Dict[str, Tuple[date, np.ndarray]] = {}
+        # Instrument keys missing from the static _SECTOR_BY_KEY map -> sector
+        self._sector_cache: Dict[str, str] = {}
         logger.info(f"Risk Manager initialized: Max positions={self.limits.max_open_positions}, "
                    f"Portfolio heat limit={self.limits.max_portfolio_heat:.1%}")
 
@@ -112,72 +219,65 @@ class RiskManager:
         Returns PositionSize or None if position cannot be sized
         """
         try:
+            limits = self.limits
+            entry_price = signal.entry_price
+
             # Determine risk per trade based on confidence
             # Higher confidence = higher risk
-            risk_percent = self.limits.min_risk_per_trade + \
-                          (signal.confidence - 0.65) * \
-                          (self.limits.max_risk_per_trade - self.limits.min_risk_per_trade) / 0.35
-
-            risk_percent = min(risk_percent, self.limits.max_risk_per_trade)
+            risk_percent = min(self._risk_intercept + signal.confidence * self._risk_slope,
+                               limits.max_risk_per_trade)
 
             # Calculate risk amount in rupees
-            risk_amount = self.limits.total_capital * risk_percent
+            risk_amount = limits.total_capital * risk_percent
 
             # Calculate quantity based on stop-loss distance
-            risk_per_share = abs(signal.entry_price - signal.stop_loss)
+            risk_per_share = abs(entry_price - signal.stop_loss)
 
             if risk_per_share == 0:
-                logger.warning(f"Invalid stop-loss for {signal.symbol}")
+                logger.warning("Invalid stop-loss for %s", signal.symbol)
                 return None
 
             quantity = int(risk_amount / risk_per_share)
 
             if quantity <= 0:
-                logger.warning(f"Calculated quantity is 0 for {signal.symbol}")
+                logger.warning("Calculated quantity is 0 for %s", signal.symbol)
                 return None
 
-            # Calculate position value
-            position_value = quantity * signal.entry_price
+            # Intraday with 5x leverage, delivery has no margin
+            intraday = signal.product == 'I'
+            leverage = self._intraday_margin_div if intraday else 1.0
 
-            # Calculate margin required
-            if signal.product == 'I':  # Intraday with 5x leverage
-                margin_required = position_value / 5
-                capital_required = margin_required
-            else:  # Delivery, no margin
-                margin_required = position_value
-                capital_required = position_value
+            # Calculate position value and margin required
+            position_value = quantity * entry_price
+            margin_required = position_value / leverage
 
             # Check if we have enough capital
-            if capital_required > available_capital:
+            if margin_required > available_capital:
                 # Reduce quantity to fit available capital
-                if signal.product == 'I':
-                    quantity = int((available_capital * 5) / signal.entry_price)
-                else:
-                    quantity = int(available_capital / signal.entry_price)
+                quantity = int((available_capital * leverage) / entry_price)
 
                 # Recalculate
-                position_value = quantity * signal.entry_price
-                margin_required = position_value / 5 if signal.product == 'I' else position_value
-                capital_required = margin_required if signal.product == 'I' else position_value
+                position_value = quantity * entry_price
+                margin_required = position_value / leverage
                 risk_amount = quantity * risk_per_share
 
             if quantity <= 0:
-                logger.warning(f"Insufficient capital for {signal.symbol}")
+                logger.warning("Insufficient capital for %s", signal.symbol)
                 return None
 
             # Calculate R:R ratio
-            reward = abs(signal.target - signal.entry_price) * quantity
+            reward = abs(signal.target - entry_price) * quantity
             risk = risk_amount
             rr_ratio = reward / risk if risk > 0 else 0
 
             # Check minimum R:R
-            min_rr = 1.5 if signal.product == 'I' else 1.2
+            min_rr = self._min_rr_i if intraday else self._min_rr_d
             if rr_ratio < min_rr:
-                logger.warning(f"R:R ratio {rr_ratio:.2f} < {min_rr} for {signal.symbol}")
+                logger.warning("R:R ratio %.2f < %s for %s", rr_ratio, min_rr, signal.symbol)
                 return None
 
             # Check maximum position size (10% of total capital)
-            max_position_value = self.limits.total_capital * 0.10
+            max_position_value = self._max_pos_value
             if position_value > max_position_value:
                 # Scale down
                 scale_factor = max_position_value / position_value
@@ -187,100 +287,103 @@ class RiskManager:
                     return None
 
                 # Recalculate
-                position_value = quantity * signal.entry_price
-                margin_required = position_value / 5 if signal.product == 'I' else position_value
-                capital_required = margin_required if signal.product == 'I' else position_value
+                position_value = quantity * entry_price
+                margin_required = position_value / leverage
                 risk_amount = quantity * risk_per_share
 
+            # Capital required is the margin (intraday) or full value (delivery)
             return PositionSize(
                 quantity=quantity,
                 risk_amount=risk_amount,
                 rr_ratio=rr_ratio,
                 margin_required=margin_required,
-                capital_required=capital_required
+                capital_required=margin_required
             )
 
         except Exception as e:
-            logger.error(f"Error calculating position size for {signal.symbol}: {e}")
+            logger.error("Error calculating position size for %s: %s", signal.symbol, e)
             return None
 
     # ==================== PORTFOLIO LIMITS ====================
 
     def check_portfolio_limits(self, new_signal: Signal, position_size: PositionSize,
-                               open_trades: List[Trade], portfolio: Portfolio) -> Tuple[bool, str]:
+                               open_trades: List[Trade], portfolio: Portfolio,
+                               reserved_heat: float = 0.0) -> Tuple[bool, str]:
         """
         Check if new trade passes portfolio-level limits
+        reserved_heat: risk of trades approved earlier in this batch but not yet recorded
         Returns (allowed, reason)
         """
         try:
-            # Limit 1: Max open positions
-            if len(open_trades) >= self.limits.max_open_positions:
-                return False, f"Max open positions reached ({self.limits.max_open_positions})"
+            # Cheapest checks first: scalar comparisons reject before any pass over open_trades
+            limits = self.limits
 
-            # Limit 2: Portfolio heat (total risk)
-            current_heat = sum(t.risk_amount for t in open_trades)
-            new_heat = current_heat + position_size.risk_amount
-            heat_percent = new_heat / self.limits.total_capital
+            # Limit 1: Max open positions
+            if len(open_trades) >= limits.max_open_positions:
+                return False, f"Max open positions reached ({limits.max_open_positions})"
 
-            if heat_percent > self.limits.max_portfolio_heat:
-                return False, f"Portfolio heat {heat_percent:.1%} > {self.limits.max_portfolio_heat:.1%}"
+            # Limit 2: Capital deployed
+            if portfolio.deployed_capital > limits.deployed_cap:
+                deployed_percent = portfolio.deployed_capital / limits.total_capital
+                return False, f"Capital deployed {deployed_percent:.1%} > {limits.max_capital_deployed:.1%}"
 
-            # Limit 3: Capital deployed
-            deployed_percent = portfolio.deployed_capital / self.limits.total_capital
+            # Limit 3: Circuit breaker - daily loss
+            if portfolio.total_pnl < -limits.daily_loss_cap:
+                daily_loss_percent = portfolio.total_pnl / limits.total_capital
+                return False, f"Daily circuit breaker triggered ({daily_loss_percent:.2%} loss)"
 
-            if deployed_percent > self.limits.max_capital_deployed:
-                return False, f"Capital deployed {deployed_percent:.1%} > {self.limits.max_capital_deployed:.1%}"
+            # Limit 4: Portfolio heat (total risk) - recorded trades are maintained by the engine (O(1))
+            new_heat = self.pnl_engine.get_current_heat() + reserved_heat + position_size.risk_amount
+            if new_heat > limits.heat_cap:
+                heat_percent = new_heat / limits.total_capital
+                return False, f"Portfolio heat {heat_percent:.1%} > {limits.max_portfolio_heat:.1%}"
 
-            # Limit 4: Sector concentration
+            # Open-book aggregates in one pass: capital per product, same-sector count
+            # (stops as soon as the sector limit is hit)
             new_sector = self.get_sector(new_signal.symbol)
-            same_sector_count = sum(1 for t in open_trades if self.get_sector(t.symbol) == new_sector)
-
-            if same_sector_count >= self.limits.max_positions_per_sector:
-                return False, f"Max positions in {new_sector} sector reached ({self.limits.max_positions_per_sector})"
-
-            # Limit 5: Product-specific capital allocation
+            intraday_capital_used = 0.0
+            swing_capital_used = 0.0
+            same_sector_count = 0
+            for t in open_trades:
+                if t.product == 'I':
+                    intraday_capital_used += t.margin_used
+                elif t.product == 'D':
+                    swing_capital_used += t.notional
+                sector = t.sector
+                if sector is None:
+                    sector = t.sector = self.get_sector(t.symbol)
+                if sector == new_sector:
+                    same_sector_count += 1
+                    # Limit 5: Sector concentration
+                    if same_sector_count >= limits.max_positions_per_sector:
+                        return False, f"Max positions in {new_sector} sector reached ({limits.max_positions_per_sector})"
+
+            # Limit 6: Product-specific capital allocation
             if new_signal.product == 'I':
                 # Check intraday allocation
-                intraday_capital_used = sum(
-                    t.entry_price * t.quantity / 5  # Margin calculation
-                    for t in open_trades if t.product == 'I'
-                )
-                intraday_limit = self.limits.total_capital * self.limits.intraday_allocation
-
-                if intraday_capital_used + position_size.capital_required > intraday_limit:
+                if intraday_capital_used + position_size.capital_required > limits.intraday_cap:
                     return False, f"Intraday allocation limit reached"
             else:
                 # Check swing allocation
-                swing_capital_used = sum(
-                    t.entry_price * t.quantity
-                    for t in open_trades if t.product == 'D'
-                )
-                swing_limit = self.limits.total_capital * self.limits.swing_allocation
-
-                if swing_capital_used + position_size.capital_required > swing_limit:
+                if swing_capital_used + position_size.capital_required > limits.swing_cap:
                     return False, f"Swing allocation limit reached"
 
-            # Limit 6: Circuit breaker - daily loss
-            daily_loss_percent = portfolio.total_pnl / self.limits.total_capital
-
-            if daily_loss_percent < -self.limits.max_daily_loss_percent:
-                return False, f"Daily circuit breaker triggered ({daily_loss_percent:.2%} loss)"
-
             return True, "All checks passed"
 
         except Exception as e:
-            logger.error(f"Error checking portfolio limits: {e}")
+            logger.error("Error checking portfolio limits: %s", e)
             return False, f"Error: {e}"
 
     def get_sector(self, symbol: str) -> str:
         """Get sector for symbol"""
-        try:
+        sector = _SECTOR_BY_KEY.get(symbol) or self._sector_cache.get(symbol)
+        if sector is None:
             # Extract symbol name from NSE_EQ|SYMBOL-EQ format
-            symbol_name = symbol.split('|')[1].replace('-EQ', '')
-
-            return self.SECTOR_MAP.get(symbol_name, 'Other')
-        except:
-            return 'Other'
+            _, sep, rest = symbol.partition('|')
+            name = rest.partition('|')[0].removesuffix('-EQ')
+            sector = _SECTOR_MAP.get(name, 'Other') if sep else 'Other'
+            self._sector_cache[symbol] = sector
+        return sector
 
     # ==================== CORRELATION CHECK ====================
 
@@ -293,83 +396,91 @@ class RiskManager:
             return True, "No open positions"
 
         try:
-            # Get price data for new symbol
-            new_ohlcv = self.data_layer.get_ohlcv(new_symbol, '1d', 30)
+            # Price data for the new symbol and every open position in one batched fetch
+            returns = self._daily_returns([new_symbol] + [t.symbol for t in open_trades])
+            new_returns = returns[new_symbol]
 
-            if new_ohlcv is None or len(new_ohlcv) < 20:
+            if new_returns is None:
                 # Cannot calculate correlation, allow trade
                 return True, "Insufficient data for correlation check"
 
-            new_returns = new_ohlcv['close'].pct_change().dropna()
-
-            # Check correlation with each open position
-            for trade in open_trades:
-                try:
-                    trade_ohlcv = self.data_layer.get_ohlcv(trade.symbol, '1d', 30)
-
-                    if trade_ohlcv is None or len(trade_ohlcv) < 20:
-                        continue
-
-                    trade_returns = trade_ohlcv['close'].pct_change().dropna()
-
-                    # Align the returns
-                    min_len = min(len(new_returns), len(trade_returns))
-                    if min_len < 10:
-                        continue
-
-                    new_returns_aligned = new_returns.iloc[-min_len:]
-                    trade_returns_aligned = trade_returns.iloc[-min_len:]
-
-                    # Calculate correlation
-                    correlation = np.corrcoef(new_returns_aligned, trade_returns_aligned)[0, 1]
-
-                    if abs(correlation) > self.limits.max_correlation:
-                        return False, f"High correlation ({correlation:.2f}) with {trade.symbol}"
-
-                except Exception as e:
-                    logger.debug(f"Error checking correlation with {trade.symbol}: {e}")
-                    continue
+            # Returns of every open position with usable data
+            pairs = [(t.symbol, returns[t.symbol]) for t in open_trades]
+            pairs = [(sym, r) for sym, r in pairs if r is not None]
+            if not pairs:
+                return True, "Correlation checks passed"
+
+            # Row 0 is the new symbol; rows 1..N follow pairs order, tail-aligned on the latest bar
+            # and NaN-padded at the front, so each pair correlates over its own common history
+            t = len(new_returns)
+            matrix = np.full((len(pairs) + 1, t), np.nan)
+            matrix[0] = new_returns
+            for i, (_, r) in enumerate(pairs, 1):
+                tail = r[-t:]
+                matrix[i, t - len(tail):] = tail
+
+            # Bars missing in either series of a pair are masked jointly; < 10 common bars is skipped
+            row, correlation = _first_correlated(matrix, self.limits.max_correlation, 10)
+            if row > 0:
+                return False, f"High correlation ({correlation:.2f}) with {pairs[row - 1][0]}"
 
             return True, "Correlation checks passed"
 
         except Exception as e:
-            logger.error(f"Error in correlation check: {e}")
+            logger.error("Error in correlation check: %s", e)
             # On error, allow trade (fail open)
             return True, "Correlation check error"
 
+    def _daily_returns(self, symbols: List[str]) -> Dict[str, Optional[np.ndarray]]:
+        """Last ~30 daily close-to-close returns per symbol (cached per day, NaN where a close is missing), None if < 20 bars"""
+        today = date.today()
+        result = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._returns_cache.get(symbol)
+            if cached is not None and cached[0] == today:
+                result[symbol] = cached[1]
+            else:
+                missing.append(symbol)
+
+        if missing:
+            try:
+                frames = self.data_layer.get_ohlcv_batch(missing, '1d', 30)
+            except Exception as e:
+                logger.debug("Error fetching OHLCV for correlation: %s", e)
+                frames = {}
+
+            for symbol in missing:
+                ohlcv = frames.get(symbol)
+                if ohlcv is None or len(ohlcv) < 20:
+                    result[symbol] = None
+                    continue
+                closes = ohlcv['close'].to_numpy(dtype=np.float64)
+                # Keep NaN positions so series stay aligned by bar; check_correlation masks them per pair
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    returns = closes[1:] / closes[:-1] - 1.0
+                self._returns_cache[symbol] = (today, returns)
+                result[symbol] = returns
+
+        return result
+
     # ==================== AVAILABLE CAPITAL ====================
 
     def get_available_capital(self, product: str, portfolio: Portfolio) -> float:
         """Get available capital for intraday or swing trading"""
         try:
             if product == 'I':  # Intraday
-                intraday_limit = self.limits.total_capital * self.limits.intraday_allocation
-
-                # Get intraday trades
-                open_trades = self.pnl_engine.get_open_trades()
-                intraday_trades = [t for t in open_trades if t.product == 'I']
-
-                # Calculate used capital (considering 5x margin)
-                used_capital = sum(t.entry_price * t.quantity / 5 for t in intraday_trades)
-
-                available = intraday_limit - used_capital
+                # Used capital (considering 5x margin), maintained by the P&L engine
+                available = self.limits.intraday_cap - self.pnl_engine.get_intraday_deployed()
 
             else:  # Swing/Delivery
-                swing_limit = self.limits.total_capital * self.limits.swing_allocation
-
-                # Get swing trades
-                open_trades = self.pnl_engine.get_open_trades()
-                swing_trades = [t for t in open_trades if t.product == 'D']
-
-                # Calculate used capital (no margin)
-                used_capital = sum(t.entry_price * t.quantity for t in swing_trades)
-
-                available = swing_limit - used_capital
+                # Used capital (no margin), maintained by the P&L engine
+                available = self.limits.swing_cap - self.pnl_engine.get_swing_deployed()
 
             return max(available, 0)
 
         except Exception as e:
-            logger.error(f"Error calculating available capital: {e}")
+            logger.error("Error calculating available capital: %s", e)
             return 0.0
 
 
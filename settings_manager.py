@@ -4,8 +4,17 @@ Trading settings storage - Managed via dashboard UI
 
 import json
 import os
+import threading
+from dataclasses import dataclass, fields
 from datetime import date
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+# Faster JSON (optional, falls back to the stdlib encoder)
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
 
 SETTINGS_FILE = './data/trading_settings.json'
 
@@ -24,22 +33,69 @@ DEFAULT_SETTINGS = {
 }
 
 
+@dataclass(slots=True, frozen=True)
+class TradingSettings:
+    """Immutable snapshot of trading settings (attribute access for hot paths)"""
+    mode: str = 'BACKTEST'
+    live_type: str = 'PAPER'
+    capital: float = 1000000
+    backtest_from: Optional[str] = None
+    backtest_to: Optional[str] = None
+    max_positions: int = 5
+    max_daily_loss_percent: float = 2.0
+    intraday_allocation: float = 0.7
+    swing_allocation: float = 0.3
+    auto_trade: bool = False
+    last_updated: Optional[str] = None
+
+
+# Parsed settings keyed on the file's (mtime_ns, size); a stat() replaces open + json.load.
+# The mtime check stays so writes from another process (dashboard) are still picked up.
+_settings_cache = {'mtime': None, 'data': None}
+_settings_lock = threading.RLock()
+
+
+def _cached_settings() -> Dict[str, Any]:
+    """Current merged settings (shared dict: callers must not mutate it)"""
+    try:
+        st = os.stat(SETTINGS_FILE)
+    except OSError:
+        return DEFAULT_SETTINGS
+
+    mtime = (st.st_mtime_ns, st.st_size)
+    if _settings_cache['mtime'] == mtime:
+        return _settings_cache['data']
+
+    try:
+        with open(SETTINGS_FILE, 'rb') as f:
+            raw = f.read()
+        settings = orjson.loads(raw) if _HAS_ORJSON else json.loads(raw)
+    except Exception as e:
+        print(f"Error loading settings: {e}")
+        return DEFAULT_SETTINGS
+
+    # Merge with defaults to ensure all keys exist
+    merged = {**DEFAULT_SETTINGS, **settings}
+    _settings_cache['mtime'] = mtime
+    _settings_cache['data'] = merged
+    return merged
+
+
 def load_settings() -> Dict[str, Any]:
-    """Load trading settings from file"""
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, 'r') as f:
-                settings = json.load(f)
-                # Merge with defaults to ensure all keys exist
-                return {**DEFAULT_SETTINGS, **settings}
-        except Exception as e:
-            print(f"Error loading settings: {e}")
-            return DEFAULT_SETTINGS.copy()
-    return DEFAULT_SETTINGS.copy()
+    """Load trading settings from file (cached until the file changes)"""
+    # Copy: callers (update_setting, dashboard) mutate the returned dict
+    return dict(_cached_settings())
+
+
+def load_trading_settings() -> TradingSettings:
+    """Load trading settings as a frozen TradingSettings snapshot"""
+    settings = load_settings()
+    known = {f.name for f in fields(TradingSettings)}
+    return TradingSettings(**{k: v for k, v in settings.items() if k in known})
 
 
 def save_settings(settings: Dict[str, Any]) -> bool:
-    """Save trading settings to file"""
+    """Save trading settings to file (atomically: readers never see a partial file)"""
     try:
         # Ensure data directory exists
         os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
@@ -48,8 +104,20 @@ def save_settings(settings: Dict[str, Any]) -> bool:
         from datetime import datetime
         settings['last_updated'] = datetime.now().isoformat()
 
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f, indent=2)
+        with _settings_lock:
+            tmp_file = f"{SETTINGS_FILE}.tmp"
+            if _HAS_ORJSON:
+                payload = orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(settings, indent=2).encode('utf-8')
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, SETTINGS_FILE)
+
+            # Write-through: the next read is served from memory without re-parsing
+            st = os.stat(SETTINGS_FILE)
+            _settings_cache['mtime'] = (st.st_mtime_ns, st.st_size)
+            _settings_cache['data'] = {**DEFAULT_SETTINGS, **settings}
         return True
     except Exception as e:
         print(f"Error saving settings: {e}")
@@ -58,12 +126,13 @@ def save_settings(settings: Dict[str, Any]) -> bool:
 
 def get_setting(key: str, default=None):
     """Get a specific setting"""
-    settings = load_settings()
-    return settings.get(key, default)
+    return _cached_settings().get(key, default)
 
 
 def update_setting(key: str, value: Any) -> bool:
     """Update a specific setting"""
-    settings = load_settings()
-    settings[key] = value
-    return save_settings(settings)
+    # Lock the read-modify-write so concurrent updates don't drop each other's keys
+    with _settings_lock:
+        settings = load_settings()
+        settings[key] = value
+        return save_settings(settings)
@@ -5,20 +5,81 @@ All strategies are backtestable and deterministic
 """
 
 import logging
+from operator import attrgetter
 from typing import List, Optional, Dict
-from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 
+# JIT-compiled window scans (optional, falls back to numpy slices)
+try:
+    import numba
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 from data_layer import get_data_layer, Signal
 
 logger = logging.getLogger(__name__)
 
 
+def _tail_max_loop(values: np.ndarray, window: int, offset: int = 0) -> float:
+    """
+    Max of the `window` values ending `offset` bars before the last,
+    i.e. Series.rolling(window).max().iloc[-1 - offset]; NaN if there are too few bars
+    """
+    end = len(values) - offset
+    if end < window:
+        return np.nan
+    m = values[end - window]
+    for i in range(end - window + 1, end):
+        if values[i] > m:
+            m = values[i]
+    return m
+
+
+def _tail_min_loop(values: np.ndarray, window: int, offset: int = 0) -> float:
+    """Min counterpart of _tail_max_loop (Series.rolling(window).min().iloc[-1 - offset])"""
+    end = len(values) - offset
+    if end < window:
+        return np.nan
+    m = values[end - window]
+    for i in range(end - window + 1, end):
+        if values[i] < m:
+            m = values[i]
+    return m
+
+
+def _tail_max_numpy(values: np.ndarray, window: int, offset: int = 0) -> float:
+    """Slice equivalent of _tail_max_loop"""
+    end = len(values) - offset
+    return values[end - window:end].max() if end >= window else np.nan
+
+
+def _tail_min_numpy(values: np.ndarray, window: int, offset: int = 0) -> float:
+    """Slice equivalent of _tail_min_loop"""
+    end = len(values) - offset
+    return values[end - window:end].min() if end >= window else np.nan
+
+
+if _HAS_NUMBA:
+    _tail_max = numba.njit(cache=True)(_tail_max_loop)
+    _tail_min = numba.njit(cache=True)(_tail_min_loop)
+else:
+    _tail_max = _tail_max_numpy
+    _tail_min = _tail_min_numpy
+
+
 class SignalEngine:
     """Generate trading signals using quantitative strategies"""
 
+    # Validation thresholds, shared by strategy gating and validate_signals
+    MIN_CONFIDENCE = 0.65
+    MIN_SL_PERCENT = 0.005  # stop-loss no tighter than 0.5%
+    MAX_SL_PERCENT = 0.03   # ... and no wider than 3%
+    MIN_RR_INTRADAY = 1.5
+    MIN_RR_SWING = 1.2
+
     def __init__(self):
         self.data_layer = get_data_layer()
         logger.info("Signal Engine initialized")
@@ -30,30 +91,89 @@ class SignalEngine:
         """
         all_signals = []
 
-        for symbol in symbols:
-            try:
-                # Run all 3 strategies
-                signal_1 = self.news_momentum_strategy(symbol)
-                signal_2 = self.technical_breakout_strategy(symbol)
-                signal_3 = self.mean_reversion_strategy(symbol)
-
-                # Collect valid signals
-                for signal in [signal_1, signal_2, signal_3]:
-                    if signal and signal.confidence >= 0.65:  # Minimum threshold
-                        all_signals.append(signal)
-
-            except Exception as e:
-                logger.error(f"Error generating signals for {symbol}: {e}")
+        # Symbols are independent (IO-bound fetches + pandas), so scan them concurrently;
+        # map keeps symbol order, so results are collected here exactly as the serial loop did
+        if len(symbols) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as pool:
+                for signals in pool.map(self._process_symbol, symbols):
+                    all_signals.extend(signals)
+        else:
+            for symbol in symbols:
+                all_signals.extend(self._process_symbol(symbol))
 
-        # Sort by confidence (highest first)
-        all_signals.sort(key=lambda x: x.confidence, reverse=True)
+        # Sort by confidence (highest first); stable, so ties keep symbol order
+        if all_signals:
+            confidences = np.fromiter(map(attrgetter('confidence'), all_signals), dtype=float, count=len(all_signals))
+            all_signals = [all_signals[i] for i in np.argsort(-confidences, kind='stable')]
 
         logger.info(f"Generated {len(all_signals)} signals from {len(symbols)} symbols")
         return all_signals
 
+    def _process_symbol(self, symbol: str) -> List[Signal]:
+        """Run all strategies for one symbol, returning signals above the confidence threshold"""
+        try:
+            # Fetch market data and news once, shared by all strategies
+            bundle = self._fetch_bundle(symbol)
+
+            # Run all 3 strategies, keeping signals above the minimum confidence threshold
+            signals = []
+
+            signal = self._run_strategy(self.news_momentum_strategy, symbol, bundle)
+            if signal is not None and signal.confidence >= self.MIN_CONFIDENCE:
+                signals.append(signal)
+
+            signal = self._run_strategy(self.technical_breakout_strategy, symbol, bundle)
+            if signal is not None and signal.confidence >= self.MIN_CONFIDENCE:
+                signals.append(signal)
+
+            signal = self._run_strategy(self.mean_reversion_strategy, symbol, bundle)
+            if signal is not None and signal.confidence >= self.MIN_CONFIDENCE:
+                signals.append(signal)
+
+            return signals
+
+        except Exception as e:
+            logger.error(f"Error generating signals for {symbol}: {e}")
+            return []
+
+    def _run_strategy(self, strategy, symbol: str, bundle: Optional[Dict] = None) -> Optional[Signal]:
+        """
+        Run one strategy; an unexpected failure is logged with its traceback and
+        only drops that strategy's signal (expected data gaps return None inside the strategy)
+        """
+        try:
+            return strategy(symbol, bundle)
+        except Exception:
+            logger.exception(f"Error in {strategy.__name__} for {symbol}")
+            return None
+
+    def _fetch_bundle(self, symbol: str) -> Dict:
+        """
+        Fetch every timeframe the strategies use once per symbol
+        Shorter windows are tails of the longer fetch, so each frame (and its memoized
+        indicators) is shared across strategies
+        """
+        ohlcv_15m = self.data_layer.get_ohlcv(symbol, '15m', 100)
+        ohlcv_daily = self.data_layer.get_ohlcv(symbol, '1d', 100)
+
+        return {
+            '15m_100': ohlcv_15m,
+            '15m_50': ohlcv_15m.tail(50) if ohlcv_15m is not None else None,
+            '30m_50': self.data_layer.get_ohlcv(symbol, '30m', 50),
+            '1d_100': ohlcv_daily,
+            '1d_50': ohlcv_daily.tail(50) if ohlcv_daily is not None else None,
+            'news_4h': self.data_layer.get_news(symbol, lookback_hours=4),
+        }
+
+    def _ohlcv(self, symbol: str, interval: str, bars: int, bundle: Optional[Dict]) -> Optional[pd.DataFrame]:
+        """OHLCV from the prefetched bundle if given, otherwise from the data layer"""
+        if bundle is not None:
+            return bundle[f"{interval}_{bars}"]
+        return self.data_layer.get_ohlcv(symbol, interval, bars)
+
     # ==================== STRATEGY 1: NEWS MOMENTUM ====================
 
-    def news_momentum_strategy(self, symbol: str) -> Optional[Signal]:
+    def news_momentum_strategy(self, symbol: str, bundle: Optional[Dict] = None) -> Optional[Signal]:
         """
         Entry Conditions (ALL must be true):
         1. News sentiment > 0.6 in last 4 hours
@@ -67,97 +187,101 @@ class SignalEngine:
         - Stop: 0.75% loss OR VWAP breakdown
         - Time: Close at EOD if intraday
         """
-        try:
-            # Get data
-            ohlcv_intraday = self.data_layer.get_ohlcv(symbol, '15m', 50)
-            ohlcv_daily = self.data_layer.get_ohlcv(symbol, '1d', 50)
+        # News sentiment gates the strategy, so check it before any market data work
+        if bundle is not None:
+            news = bundle['news_4h']
+        else:
             news = self.data_layer.get_news(symbol, lookback_hours=4)
 
-            if ohlcv_intraday is None or ohlcv_daily is None:
-                return None
-
-            # Calculate indicators
-            indicators_intraday = self.data_layer.calculate_indicators(ohlcv_intraday)
-            indicators_daily = self.data_layer.calculate_indicators(ohlcv_daily)
-
-            # Calculate news sentiment
-            news_score = self.data_layer.score_sentiment(news)
-
-            current_price = indicators_intraday.get('close', 0)
-
-            # Validate current price
-            if current_price <= 0:
-                logger.warning(f"Invalid current price for {symbol}: {current_price}")
-                return None
-
-            vwap = indicators_intraday.get('vwap', 0)
-            rsi = indicators_intraday.get('rsi', 50)
-            sma_20 = indicators_intraday.get('sma_20', 0)
-            volume = ohlcv_intraday['volume'].iloc[-1]
-            avg_volume = indicators_intraday.get('volume_sma', 0)
-
-            # Entry Conditions
-            conditions = {
-                'news_sentiment': news_score > 0.6,
-                'price_above_vwap': current_price > vwap > 0,
-                'volume_spike': volume > avg_volume * 1.5 if avg_volume > 0 else False,
-                'rsi_not_overbought': rsi < 70,
-                'price_above_sma': current_price > sma_20 > 0
-            }
-
-            # Check if all conditions met
-            if not all(conditions.values()):
-                return None
-
-            # Calculate confidence
-            # Base confidence from news
-            confidence = 0.65 + (news_score - 0.6) * 0.5  # 0.65 to 0.85 range
-
-            # Boost confidence if volume is very high
-            if volume > avg_volume * 2:
-                confidence += 0.05
-
-            # Boost if daily trend also strong
-            if indicators_daily.get('rsi', 50) > 50 and indicators_daily.get('close', 0) > indicators_daily.get('sma_20', 0):
-                confidence += 0.05
-
-            confidence = min(confidence, 0.95)  # Cap at 0.95
-
-            # Calculate entry, stop-loss, target
-            entry_price = current_price
-
-            # Stop-loss: 0.75% below entry or VWAP, whichever is tighter
-            sl_percent = entry_price * 0.0075
-            sl_vwap = vwap
-            stop_loss = max(entry_price - sl_percent, sl_vwap)
-
-            # Target: 1.5% gain
-            target = entry_price * 1.015
-
-            # Determine product (intraday or delivery)
-            # News momentum is typically short-term, so intraday
-            product = 'I'
-
-            return Signal(
-                symbol=symbol,
-                strategy='news_momentum',
-                direction='BUY',
-                entry_price=entry_price,
-                stop_loss=stop_loss,
-                target=target,
-                confidence=confidence,
-                product=product,
-                news_score=news_score,
-                tech_score=rsi / 100.0  # Normalize to 0-1
-            )
+        news_score = self.data_layer.score_sentiment(news)
+        if news_score <= 0.6:
+            return None
+
+        # Get data
+        ohlcv_intraday = self._ohlcv(symbol, '15m', 50, bundle)
+        ohlcv_daily = self._ohlcv(symbol, '1d', 50, bundle)
 
-        except Exception as e:
-            logger.error(f"Error in news_momentum_strategy for {symbol}: {e}")
+        if ohlcv_intraday is None or ohlcv_daily is None:
             return None
 
+        # Calculate indicators
+        indicators_intraday = self.data_layer.calculate_indicators(ohlcv_intraday)
+        indicators_daily = self.data_layer.calculate_indicators(ohlcv_daily)
+
+        current_price = indicators_intraday.close
+
+        # Validate current price
+        if current_price <= 0:
+            logger.warning(f"Invalid current price for {symbol}: {current_price}")
+            return None
+
+        vwap = indicators_intraday.vwap
+        rsi = indicators_intraday.rsi
+        sma_20 = indicators_intraday.sma_20
+        volume = indicators_intraday.arrays['volume'][-1]
+        avg_volume = indicators_intraday.volume_sma
+
+        # Entry Conditions (short-circuit, most selective first)
+        if not (news_score > 0.6
+                and rsi < 70
+                and avg_volume > 0 and volume > avg_volume * 1.5
+                and current_price > vwap > 0
+                and current_price > sma_20 > 0):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s news_momentum rejected: %s", symbol, {
+                    'news_sentiment': news_score > 0.6,
+                    'rsi_not_overbought': rsi < 70,
+                    'volume_spike': avg_volume > 0 and volume > avg_volume * 1.5,
+                    'price_above_vwap': current_price > vwap > 0,
+                    'price_above_sma': current_price > sma_20 > 0
+                })
+            return None
+
+        # Calculate confidence
+        # Base confidence from news
+        confidence = 0.65 + (news_score - 0.6) * 0.5  # 0.65 to 0.85 range
+
+        # Boost confidence if volume is very high
+        if volume > avg_volume * 2:
+            confidence += 0.05
+
+        # Boost if daily trend also strong
+        if indicators_daily.rsi > 50 and indicators_daily.close > indicators_daily.sma_20:
+            confidence += 0.05
+
+        confidence = min(confidence, 0.95)  # Cap at 0.95
+
+        # Calculate entry, stop-loss, target
+        entry_price = current_price
+
+        # Stop-loss: 0.75% below entry or VWAP, whichever is tighter
+        sl_percent = entry_price * 0.0075
+        sl_vwap = vwap
+        stop_loss = max(entry_price - sl_percent, sl_vwap)
+
+        # Target: 1.5% gain
+        target = entry_price * 1.015
+
+        # Determine product (intraday or delivery)
+        # News momentum is typically short-term, so intraday
+        product = 'I'
+
+        return Signal(
+            symbol=symbol,
+            strategy='news_momentum',
+            direction='BUY',
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            target=target,
+            confidence=confidence,
+            product=product,
+            news_score=news_score,
+            tech_score=rsi / 100.0  # Normalize to 0-1
+        )
+
     # ==================== STRATEGY 2: TECHNICAL BREAKOUT ====================
 
-    def technical_breakout_strategy(self, symbol: str) -> Optional[Signal]:
+    def technical_breakout_strategy(self, symbol: str, bundle: Optional[Dict] = None) -> Optional[Signal]:
         """
         Entry Conditions (ALL must be true):
         1. Price breaks above 20-day high with volume > 2x average
@@ -170,113 +294,112 @@ class SignalEngine:
         - Stop: 1.2% loss OR below recent swing low
         - Trailing: Move SL to breakeven after 1R gain
         """
-        try:
-            # Get data
-            ohlcv_daily = self.data_layer.get_ohlcv(symbol, '1d', 100)
-            ohlcv_intraday = self.data_layer.get_ohlcv(symbol, '30m', 50)
-
-            if ohlcv_daily is None or ohlcv_intraday is None:
-                return None
-
-            # Calculate indicators
-            indicators_daily = self.data_layer.calculate_indicators(ohlcv_daily)
-            indicators_intraday = self.data_layer.calculate_indicators(ohlcv_intraday)
-
-            current_price = indicators_intraday.get('close', 0)
-
-            # Validate current price
-            if current_price <= 0:
-                logger.warning(f"Invalid current price for {symbol}: {current_price}")
-                return None
-
-            high_20d = ohlcv_daily['high'].rolling(20).max().iloc[-2]  # Previous 20-day high
-            volume = ohlcv_daily['volume'].iloc[-1]
-            avg_volume = indicators_daily.get('volume_sma', 0)
-            adx = indicators_daily.get('adx', 0)
-            sma_20 = indicators_daily.get('sma_20', 0)
-            sma_50 = indicators_daily.get('sma_50', 0)
-            macd = indicators_daily.get('macd', 0)
-            macd_signal = indicators_daily.get('macd_signal', 0)
-            macd_hist = indicators_daily.get('macd_hist', 0)
-
-            # Check for MACD crossover in last 3 bars
-            macd_crossover = False
-            if len(ohlcv_daily) >= 3:
-                # Recalculate MACD for previous bars
-                for i in range(1, 4):
-                    prev_ohlcv = ohlcv_daily.iloc[:-i]
-                    if len(prev_ohlcv) >= 26:
-                        prev_indicators = self.data_layer.calculate_indicators(prev_ohlcv)
-                        prev_macd_hist = prev_indicators.get('macd_hist', 0)
-                        if prev_macd_hist < 0 and macd_hist > 0:
-                            macd_crossover = True
-                            break
-
-            # Entry Conditions
-            conditions = {
-                'price_breakout': current_price > high_20d > 0,
-                'volume_spike': volume > avg_volume * 2 if avg_volume > 0 else False,
-                'strong_trend': adx > 25,
-                'macd_crossover': macd_crossover,
-                'uptrend_structure': (current_price > sma_50 > 0) and (sma_20 > sma_50)
-            }
-
-            # Check if all conditions met
-            if not all(conditions.values()):
-                return None
-
-            # Calculate confidence
-            confidence = 0.70  # Base for breakout
-
-            # Boost for very high volume
-            if volume > avg_volume * 3:
-                confidence += 0.05
-
-            # Boost for very strong trend
-            if adx > 35:
-                confidence += 0.05
-
-            # Boost if far above resistance
-            breakout_strength = (current_price - high_20d) / high_20d
-            if breakout_strength > 0.02:  # 2% above resistance
-                confidence += 0.05
-
-            confidence = min(confidence, 0.95)
-
-            # Calculate entry, stop-loss, target
-            entry_price = current_price
-
-            # Stop-loss: 1.2% below entry or recent swing low
-            swing_low = ohlcv_daily['low'].rolling(10).min().iloc[-1]
-            sl_percent = entry_price * 0.012
-            stop_loss = max(entry_price - sl_percent, swing_low)
-
-            # Target: 2.5% gain
-            target = entry_price * 1.025
-
-            # Breakouts can be held longer (delivery)
-            product = 'D'
-
-            return Signal(
-                symbol=symbol,
-                strategy='technical_breakout',
-                direction='BUY',
-                entry_price=entry_price,
-                stop_loss=stop_loss,
-                target=target,
-                confidence=confidence,
-                product=product,
-                news_score=0.0,  # Not news-based
-                tech_score=min(adx / 50.0, 1.0)  # Normalize ADX to 0-1
-            )
+        # Get data
+        ohlcv_daily = self._ohlcv(symbol, '1d', 100, bundle)
+        ohlcv_intraday = self._ohlcv(symbol, '30m', 50, bundle)
 
-        except Exception as e:
-            logger.error(f"Error in technical_breakout_strategy for {symbol}: {e}")
+        if ohlcv_daily is None or ohlcv_intraday is None:
             return None
 
+        # Calculate indicators
+        indicators_daily = self.data_layer.calculate_indicators(ohlcv_daily)
+        indicators_intraday = self.data_layer.calculate_indicators(ohlcv_intraday)
+
+        current_price = indicators_intraday.close
+
+        # Validate current price
+        if current_price <= 0:
+            logger.warning(f"Invalid current price for {symbol}: {current_price}")
+            return None
+
+        daily_arrays = indicators_daily.arrays
+        if daily_arrays is None:  # Too little daily history for ADX/SMA(50)
+            return None
+
+        high_20d = _tail_max(daily_arrays['high'], 20, 1)  # Previous 20-day high
+        volume = daily_arrays['volume'][-1]
+        avg_volume = indicators_daily.volume_sma
+        adx = indicators_daily.adx
+        sma_20 = indicators_daily.sma_20
+        sma_50 = indicators_daily.sma_50
+        macd = indicators_daily.macd
+        macd_signal = indicators_daily.macd_signal
+        macd_hist = indicators_daily.macd_hist
+
+        # Entry Conditions (short-circuit; the MACD crossover scan only runs if the scalar checks pass)
+        if not (current_price > high_20d > 0
+                and adx > 25
+                and avg_volume > 0 and volume > avg_volume * 2
+                and current_price > sma_50 > 0 and sma_20 > sma_50):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s technical_breakout rejected: %s", symbol, {
+                    'price_breakout': current_price > high_20d > 0,
+                    'strong_trend': adx > 25,
+                    'volume_spike': avg_volume > 0 and volume > avg_volume * 2,
+                    'uptrend_structure': (current_price > sma_50 > 0) and (sma_20 > sma_50)
+                })
+            return None
+
+        # Check for MACD crossover in last 3 bars (histogram of the previous bars from one pass)
+        macd_crossover = False
+        if len(ohlcv_daily) >= 3:
+            hist = self.data_layer.calculate_macd_histogram(ohlcv_daily)
+            # Previous bars count only with the 50 bars of history calculate_indicators needs
+            prev_hist = hist[max(49, len(hist) - 4):-1]
+            macd_crossover = macd_hist > 0 and bool(np.any(prev_hist < 0))
+
+        if not macd_crossover:
+            logger.debug("%s technical_breakout rejected: no MACD crossover", symbol)
+            return None
+
+        # Calculate confidence
+        confidence = 0.70  # Base for breakout
+
+        # Boost for very high volume
+        if volume > avg_volume * 3:
+            confidence += 0.05
+
+        # Boost for very strong trend
+        if adx > 35:
+            confidence += 0.05
+
+        # Boost if far above resistance
+        breakout_strength = (current_price - high_20d) / high_20d
+        if breakout_strength > 0.02:  # 2% above resistance
+            confidence += 0.05
+
+        confidence = min(confidence, 0.95)
+
+        # Calculate entry, stop-loss, target
+        entry_price = current_price
+
+        # Stop-loss: 1.2% below entry or recent swing low
+        swing_low = _tail_min(daily_arrays['low'], 10)
+        sl_percent = entry_price * 0.012
+        stop_loss = max(entry_price - sl_percent, swing_low)
+
+        # Target: 2.5% gain
+        target = entry_price * 1.025
+
+        # Breakouts can be held longer (delivery)
+        product = 'D'
+
+        return Signal(
+            symbol=symbol,
+            strategy='technical_breakout',
+            direction='BUY',
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            target=target,
+            confidence=confidence,
+            product=product,
+            news_score=0.0,  # Not news-based
+            tech_score=min(adx / 50.0, 1.0)  # Normalize ADX to 0-1
+        )
+
     # ==================== STRATEGY 3: MEAN REVERSION ====================
 
-    def mean_reversion_strategy(self, symbol: str) -> Optional[Signal]:
+    def mean_reversion_strategy(self, symbol: str, bundle: Optional[Dict] = None) -> Optional[Signal]:
         """
         Entry Conditions (ALL must be true):
         1. RSI < 30 (oversold) OR price at lower Bollinger Band
@@ -289,141 +412,143 @@ class SignalEngine:
         - Stop: 1% below support
         - Time: Close by 3:15 PM (don't hold overnight)
         """
-        try:
-            # Get data
-            ohlcv_intraday = self.data_layer.get_ohlcv(symbol, '15m', 100)
-            ohlcv_daily = self.data_layer.get_ohlcv(symbol, '1d', 50)
-
-            if ohlcv_intraday is None or ohlcv_daily is None:
-                return None
-
-            # Calculate indicators
-            indicators_intraday = self.data_layer.calculate_indicators(ohlcv_intraday)
-            indicators_daily = self.data_layer.calculate_indicators(ohlcv_daily)
-
-            current_price = indicators_intraday.get('close', 0)
-
-            # Validate current price
-            if current_price <= 0:
-                logger.warning(f"Invalid current price for {symbol}: {current_price}")
-                return None
-
-            rsi = indicators_intraday.get('rsi', 50)
-            bb_lower = indicators_intraday.get('bb_lower', 0)
-            bb_middle = indicators_intraday.get('bb_middle', 0)
-            adx = indicators_daily.get('adx', 25)
-            volume = ohlcv_intraday['volume'].iloc[-1]
-            avg_volume = indicators_intraday.get('volume_sma', 0)
-
-            # Find recent support
-            support = ohlcv_intraday['low'].rolling(20).min().iloc[-1]
-
-            # Entry Conditions
-            oversold = (rsi < 30) or (current_price <= bb_lower * 1.01)  # Within 1% of BB lower
-            weak_trend = adx < 20
-            near_support = abs(current_price - support) / current_price < 0.02  # Within 2% of support
-            normal_volume = 0.7 < (volume / avg_volume) < 1.5 if avg_volume > 0 else True  # Not panic
-
-            conditions = {
-                'oversold': oversold,
-                'weak_trend': weak_trend,
-                'near_support': near_support,
-                'normal_volume': normal_volume
-            }
-
-            # Check if all conditions met
-            if not all(conditions.values()):
-                return None
-
-            # Calculate confidence
-            confidence = 0.65  # Base for mean reversion
-
-            # Boost if RSI is extremely oversold
-            if rsi < 25:
-                confidence += 0.05
-
-            # Boost if price is below BB lower
-            if current_price < bb_lower:
-                confidence += 0.05
-
-            # Boost if near major support (daily low)
-            daily_support = ohlcv_daily['low'].rolling(20).min().iloc[-1]
-            if abs(current_price - daily_support) / current_price < 0.01:
-                confidence += 0.05
-
-            confidence = min(confidence, 0.90)
-
-            # Calculate entry, stop-loss, target
-            entry_price = current_price
-
-            # Stop-loss: 1% below support
-            stop_loss = support * 0.99
-
-            # Target: Middle Bollinger Band (mean reversion target)
-            target = bb_middle if bb_middle > current_price else current_price * 1.015
-
-            # Mean reversion is short-term (intraday)
-            product = 'I'
-
-            return Signal(
-                symbol=symbol,
-                strategy='mean_reversion',
-                direction='BUY',
-                entry_price=entry_price,
-                stop_loss=stop_loss,
-                target=target,
-                confidence=confidence,
-                product=product,
-                news_score=0.0,  # Not news-based
-                tech_score=(50 - rsi) / 50.0  # Normalize oversold condition to 0-1
-            )
+        # Get data
+        ohlcv_intraday = self._ohlcv(symbol, '15m', 100, bundle)
+        ohlcv_daily = self._ohlcv(symbol, '1d', 50, bundle)
 
-        except Exception as e:
-            logger.error(f"Error in mean_reversion_strategy for {symbol}: {e}")
+        if ohlcv_intraday is None or ohlcv_daily is None:
             return None
 
-    # ==================== SIGNAL VALIDATION ====================
+        # Calculate indicators
+        indicators_intraday = self.data_layer.calculate_indicators(ohlcv_intraday)
+        indicators_daily = self.data_layer.calculate_indicators(ohlcv_daily)
 
-    def validate_signal(self, signal: Signal) -> bool:
-        """Validate signal before execution"""
-        try:
-            # Check R:R ratio
-            risk = abs(signal.entry_price - signal.stop_loss)
-            reward = abs(signal.target - signal.entry_price)
+        current_price = indicators_intraday.close
+
+        # Validate current price
+        if current_price <= 0:
+            logger.warning(f"Invalid current price for {symbol}: {current_price}")
+            return None
+
+        rsi = indicators_intraday.rsi
+        bb_lower = indicators_intraday.bb_lower
+        bb_middle = indicators_intraday.bb_middle
+        adx = indicators_daily.adx
+        intraday_arrays = indicators_intraday.arrays
+        volume = intraday_arrays['volume'][-1]
+        avg_volume = indicators_intraday.volume_sma
+
+        # Find recent support
+        support = _tail_min(intraday_arrays['low'], 20)
+
+        # Entry Conditions (short-circuit, cheapest first)
+        if not (adx < 20  # Weak trend
+                and ((rsi < 30) or (current_price <= bb_lower * 1.01))  # Oversold / within 1% of BB lower
+                and (not (avg_volume > 0) or 0.7 < (volume / avg_volume) < 1.5)  # Normal volume, not panic
+                and abs(current_price - support) / current_price < 0.02):  # Within 2% of support
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s mean_reversion rejected: %s", symbol, {
+                    'oversold': (rsi < 30) or (current_price <= bb_lower * 1.01),
+                    'weak_trend': adx < 20,
+                    'near_support': abs(current_price - support) / current_price < 0.02,
+                    'normal_volume': not (avg_volume > 0) or 0.7 < (volume / avg_volume) < 1.5
+                })
+            return None
+
+        # Calculate confidence
+        confidence = 0.65  # Base for mean reversion
+
+        # Boost if RSI is extremely oversold
+        if rsi < 25:
+            confidence += 0.05
+
+        # Boost if price is below BB lower
+        if current_price < bb_lower:
+            confidence += 0.05
 
-            if risk == 0:
-                return False
+        # Boost if near major support (daily low)
+        daily_support = _tail_min(indicators_daily.arrays['low'], 20)
+        if abs(current_price - daily_support) / current_price < 0.01:
+            confidence += 0.05
 
-            rr_ratio = reward / risk
+        confidence = min(confidence, 0.90)
 
-            # Minimum R:R requirements
-            min_rr = 1.5 if signal.product == 'I' else 1.2
+        # Calculate entry, stop-loss, target
+        entry_price = current_price
 
-            if rr_ratio < min_rr:
-                logger.warning(f"Signal {signal.symbol} rejected: R:R {rr_ratio:.2f} < {min_rr}")
-                return False
+        # Stop-loss: 1% below support
+        stop_loss = support * 0.99
 
-            # Check stop-loss distance (not too tight, not too wide)
-            sl_percent = risk / signal.entry_price
+        # Target: Middle Bollinger Band (mean reversion target)
+        target = bb_middle if bb_middle > current_price else current_price * 1.015
 
-            if sl_percent < 0.005:  # Less than 0.5%
-                logger.warning(f"Signal {signal.symbol} rejected: Stop-loss too tight ({sl_percent:.2%})")
-                return False
+        # Mean reversion is short-term (intraday)
+        product = 'I'
 
-            if sl_percent > 0.03:  # More than 3%
-                logger.warning(f"Signal {signal.symbol} rejected: Stop-loss too wide ({sl_percent:.2%})")
-                return False
+        return Signal(
+            symbol=symbol,
+            strategy='mean_reversion',
+            direction='BUY',
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            target=target,
+            confidence=confidence,
+            product=product,
+            news_score=0.0,  # Not news-based
+            tech_score=(50 - rsi) / 50.0  # Normalize oversold condition to 0-1
+        )
 
-            # Check confidence
-            if signal.confidence < 0.65:
-                return False
+    # ==================== SIGNAL VALIDATION ====================
 
-            return True
+    def validate_signal(self, signal: Signal) -> bool:
+        """Validate signal before execution (single-signal form of validate_signals)"""
+        try:
+            return bool(self.validate_signals([signal]))
 
         except Exception as e:
             logger.error(f"Error validating signal {signal.symbol}: {e}")
             return False
 
+    def validate_signals(self, signals: List[Signal]) -> List[Signal]:
+        """
+        Validate a batch of signals in one vectorized pass: confidence, stop-loss
+        distance (not too tight, not too wide) and minimum R:R per product
+        Returns the signals that pass, in their original order
+        """
+        if not signals:
+            return []
+
+        n = len(signals)
+        entry = np.fromiter((s.entry_price for s in signals), dtype=float, count=n)
+        stop = np.fromiter((s.stop_loss for s in signals), dtype=float, count=n)
+        target = np.fromiter((s.target for s in signals), dtype=float, count=n)
+        conf = np.fromiter((s.confidence for s in signals), dtype=float, count=n)
+        intraday = np.fromiter((s.product == 'I' for s in signals), dtype=bool, count=n)
+
+        risk = np.abs(entry - stop)
+        reward = np.abs(target - entry)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rr_ratio = np.where(risk > 0, reward / risk, 0.0)
+            sl_percent = np.where(entry != 0, risk / entry, np.inf)
+
+        # Minimum R:R requirements
+        min_rr = np.where(intraday, self.MIN_RR_INTRADAY, self.MIN_RR_SWING)
+
+        conf_ok = conf >= self.MIN_CONFIDENCE
+        rr_ok = rr_ratio >= min_rr
+        sl_ok = (sl_percent >= self.MIN_SL_PERCENT) & (sl_percent <= self.MAX_SL_PERCENT)
+        valid = (risk > 0) & rr_ok & sl_ok & conf_ok
+
+        # Log reasons only for rejected signals: stop-loss distance first, then R:R
+        for i in np.flatnonzero(~valid & (risk > 0) & conf_ok):
+            if not sl_ok[i]:
+                kind = "tight" if sl_percent[i] < self.MIN_SL_PERCENT else "wide"
+                logger.warning(f"Signal {signals[i].symbol} rejected: Stop-loss too {kind} ({sl_percent[i]:.2%})")
+            elif not rr_ok[i]:
+                logger.warning(f"Signal {signals[i].symbol} rejected: R:R {rr_ratio[i]:.2f} < {min_rr[i]}")
+
+        return [signals[i] for i in np.flatnonzero(valid)]
+
 
 # Singleton instance
 _signal_engine = None
@@ -455,9 +580,9 @@ if __name__ == "__main__":
         print(f"\nAnalyzing {symbol}...")
 
         # Test each strategy
-        signal_1 = engine.news_momentum_strategy(symbol)
-        signal_2 = engine.technical_breakout_strategy(symbol)
-        signal_3 = engine.mean_reversion_strategy(symbol)
+        signal_1 = engine._run_strategy(engine.news_momentum_strategy, symbol)
+        signal_2 = engine._run_strategy(engine.technical_breakout_strategy, symbol)
+        signal_3 = engine._run_strategy(engine.mean_reversion_strategy, symbol)
 
         signals = [s for s in [signal_1, signal_2, signal_3] if s is not None]
 
@@ -6,7 +6,6 @@ Handles token refresh with email notifications before starting the main system
 
 import logging
 import sys
-import time
 from datetime import datetime
 
 # Import configuration
@@ -80,7 +79,6 @@ def main():
         logger.info("\nStep 3: Starting Callback Server...")
         token_manager.start_callback_server(port=config.CALLBACK_SERVER_PORT)
         logger.info(f"✅ Callback server running on port {config.CALLBACK_SERVER_PORT}")
-        time.sleep(2)  # Give server time to start
 
     # Step 4: Check Token Validity
     logger.info("\nStep 4: Checking Upstox Access Token...")
@@ -4,22 +4,98 @@ Runs a callback server to catch authorization code and exchange for access token
 """
 
 import os
+import html
 import json
 import logging
 import requests
 import threading
 from datetime import datetime, timedelta
-from typing import Optional, Dict
-from flask import Flask, request, jsonify
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlparse, parse_qs, urlencode
 import time
 
+# Faster JSON (optional, falls back to the stdlib encoder)
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
 
+_AUTH_ERROR_HTML = """
+<html>
+<body style="font-family: Arial; padding: 50px; text-align: center;">
+    <h1 style="color: red;">❌ Authorization Failed</h1>
+    <p>Error: {error}</p>
+    <p>Please try again or check your credentials.</p>
+</body>
+</html>
+"""
+
+_AUTH_SUCCESS_HTML = """
+<html>
+<body style="font-family: Arial; padding: 50px; text-align: center;">
+    <h1 style="color: green;">✅ Authorization Successful!</h1>
+    <p>TradeGo has been authorized.</p>
+    <p>Trading will resume automatically.</p>
+    <p style="color: #666; margin-top: 40px;">You can close this window.</p>
+</body>
+</html>
+"""
+
+_TOKEN_EXCHANGE_FAILED_HTML = """
+<html>
+<body style="font-family: Arial; padding: 50px; text-align: center;">
+    <h1 style="color: red;">❌ Token Exchange Failed</h1>
+    <p>Could not obtain access token.</p>
+    <p>Please check logs and try again.</p>
+</body>
+</html>
+"""
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    """Serves /callback (Upstox OAuth redirect) and /status for the owning TokenManager"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        tm = self.server.token_manager
+
+        if url.path == '/callback':
+            params = parse_qs(url.query)
+            status, body = tm._handle_callback(params.get('code', [None])[0], params.get('error', [None])[0])
+            self._send(status, body, 'text/html; charset=utf-8')
+        elif url.path == '/status':
+            body = json.dumps({
+                'token_valid': tm.is_token_valid(),
+                'token_expiry': tm.token_expiry.isoformat() if tm.token_expiry else None
+            })
+            self._send(200, body, 'application/json')
+        else:
+            self._send(404, "Not Found", 'text/plain; charset=utf-8')
+
+    def _send(self, status: int, body: str, content_type: str):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep per-request access lines out of the trading log
+
+
 class TokenManager:
     """Manage Upstox API token refresh with OAuth2 flow"""
 
     TOKEN_FILE = "./data/upstox_token.json"
+    HTTP_TIMEOUT = (3, 10)  # (connect, read) seconds
+    TOKEN_RETRIES = 3  # attempts on 429/5xx from the token endpoint
+    TOKEN_RETRY_BACKOFF = 0.5  # seconds, doubled after each attempt
 
     def __init__(self, api_key: str, api_secret: str, redirect_uri: str):
         self.api_key = api_key
@@ -31,18 +107,37 @@ class TokenManager:
         self.authorization_code = None
         self.callback_server = None
         self.server_thread = None
+        self._persisted = None  # (access_token, expiry) currently on disk
+
+        # Keep-alive session so token refreshes reuse the TLS connection to Upstox
+        self.sess = requests.Session()
+
+        # Set whenever a new token is obtained; wakes wait_for_authorization
+        self._token_event = threading.Event()
 
         # Load existing token
         self._load_token()
 
         logger.info("Token Manager initialized")
 
+    @property
+    def token_expiry(self) -> Optional[datetime]:
+        """Wall-clock token expiry (for display and persistence)"""
+        return self._token_expiry
+
+    @token_expiry.setter
+    def token_expiry(self, expiry: Optional[datetime]):
+        self._token_expiry = expiry
+        # Epoch deadline incl. the 1-hour safety margin, so validity checks are a float compare
+        self._valid_until = expiry.timestamp() - 3600 if expiry else 0.0
+
     def _load_token(self):
         """Load token from file"""
         try:
             if os.path.exists(self.TOKEN_FILE):
-                with open(self.TOKEN_FILE, 'r') as f:
-                    data = json.load(f)
+                with open(self.TOKEN_FILE, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if _HAS_ORJSON else json.loads(raw)
 
                 self.access_token = data.get('access_token')
                 expiry_str = data.get('expiry')
@@ -50,12 +145,16 @@ class TokenManager:
                 if expiry_str:
                     self.token_expiry = datetime.fromisoformat(expiry_str)
 
+                self._persisted = (self.access_token, self.token_expiry)
                 logger.info(f"Token loaded from file (expires: {self.token_expiry})")
         except Exception as e:
             logger.error(f"Error loading token: {e}")
 
     def _save_token(self):
-        """Save token to file"""
+        """Save token to file (atomically; skipped if the file already holds this token)"""
+        if self._persisted == (self.access_token, self.token_expiry):
+            return
+
         try:
             os.makedirs(os.path.dirname(self.TOKEN_FILE), exist_ok=True)
 
@@ -65,9 +164,20 @@ class TokenManager:
                 'updated_at': datetime.now().isoformat()
             }
 
-            with open(self.TOKEN_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
+            if _HAS_ORJSON:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(data, indent=2).encode('utf-8')
+
+            # Write a temp file and rename over the target, so a crash never leaves a truncated token file
+            tmp_file = f"{self.TOKEN_FILE}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.TOKEN_FILE)
 
+            self._persisted = (self.access_token, self.token_expiry)
             logger.info("Token saved to file")
         except Exception as e:
             logger.error(f"Error saving token: {e}")
@@ -77,11 +187,8 @@ class TokenManager:
         if not self.access_token:
             return False
 
-        if not self.token_expiry:
-            return False
-
-        # Token valid if expires more than 1 hour from now
-        return datetime.now() < (self.token_expiry - timedelta(hours=1))
+        # Token valid if expires more than 1 hour from now (deadline is 0 without an expiry)
+        return time.time() < self._valid_until
 
     def get_authorization_url(self) -> str:
         """Get Upstox authorization URL"""
@@ -93,8 +200,8 @@ class TokenManager:
             'response_type': 'code'
         }
 
-        # Build URL
-        auth_url = f"{base_url}?client_id={params['client_id']}&redirect_uri={params['redirect_uri']}&response_type={params['response_type']}"
+        # Build URL (query values percent-encoded)
+        auth_url = f"{base_url}?{urlencode(params)}"
 
         logger.info(f"Generated authorization URL: {auth_url}")
         return auth_url
@@ -118,7 +225,15 @@ class TokenManager:
             }
 
             logger.info("Exchanging authorization code for access token...")
-            response = requests.post(url, headers=headers, data=data)
+            for attempt in range(self.TOKEN_RETRIES):
+                response = self.sess.post(url, headers=headers, data=data, timeout=self.HTTP_TIMEOUT)
+                # Only rate limits and server errors are transient; anything else is final
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+                if attempt + 1 < self.TOKEN_RETRIES:
+                    delay = self.TOKEN_RETRY_BACKOFF * 2 ** attempt
+                    logger.warning(f"⚠️ Token endpoint returned {response.status_code}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
 
             if response.status_code == 200:
                 result = response.json()
@@ -131,6 +246,7 @@ class TokenManager:
 
                 # Save token
                 self._save_token()
+                self._token_event.set()
 
                 logger.info(f"✅ Access token obtained! Expires: {self.token_expiry}")
                 return True
@@ -143,85 +259,46 @@ class TokenManager:
             return False
 
     def start_callback_server(self, port: int = 8000):
-        """Start Flask callback server to receive authorization code"""
-
-        app = Flask(__name__)
-        app.logger.disabled = True  # Disable Flask logs
-
-        @app.route('/callback', methods=['GET'])
-        def callback():
-            """Callback endpoint for Upstox redirect"""
-            code = request.args.get('code')
-            error = request.args.get('error')
-
-            if error:
-                logger.error(f"Authorization error: {error}")
-                return f"""
-                <html>
-                <body style="font-family: Arial; padding: 50px; text-align: center;">
-                    <h1 style="color: red;">❌ Authorization Failed</h1>
-                    <p>Error: {error}</p>
-                    <p>Please try again or check your credentials.</p>
-                </body>
-                </html>
-                """, 400
-
-            if code:
-                logger.info(f"Received authorization code: {code[:20]}...")
-
-                # Exchange code for token
-                success = self.exchange_code_for_token(code)
-
-                if success:
-                    # Schedule server shutdown
-                    threading.Thread(target=self._shutdown_server, daemon=True).start()
-
-                    return """
-                    <html>
-                    <body style="font-family: Arial; padding: 50px; text-align: center;">
-                        <h1 style="color: green;">✅ Authorization Successful!</h1>
-                        <p>TradeGo has been authorized.</p>
-                        <p>Trading will resume automatically.</p>
-                        <p style="color: #666; margin-top: 40px;">You can close this window.</p>
-                    </body>
-                    </html>
-                    """
-                else:
-                    return """
-                    <html>
-                    <body style="font-family: Arial; padding: 50px; text-align: center;">
-                        <h1 style="color: red;">❌ Token Exchange Failed</h1>
-                        <p>Could not obtain access token.</p>
-                        <p>Please check logs and try again.</p>
-                    </body>
-                    </html>
-                    """, 500
-
-            return "No authorization code received", 400
-
-        @app.route('/status', methods=['GET'])
-        def status():
-            """Check token status"""
-            return jsonify({
-                'token_valid': self.is_token_valid(),
-                'token_expiry': self.token_expiry.isoformat() if self.token_expiry else None
-            })
+        """Start the callback server (stdlib HTTP) to receive the authorization code"""
+        try:
+            server = ThreadingHTTPServer(('0.0.0.0', port), _CallbackHandler)
+        except OSError as e:
+            logger.error(f"Could not start callback server on port {port}: {e}")
+            return
+
+        server.daemon_threads = True
+        server.token_manager = self
+        self.callback_server = server
 
         # Run server in a separate thread
         def run_server():
             logger.info(f"🌐 Starting callback server on port {port}...")
-            app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
+            server.serve_forever()
 
         self.server_thread = threading.Thread(target=run_server, daemon=True)
         self.server_thread.start()
 
         logger.info(f"Callback server started: http://0.0.0.0:{port}/callback")
 
-    def _shutdown_server(self):
-        """Shutdown callback server after successful authorization"""
-        time.sleep(2)  # Wait 2 seconds
-        logger.info("Token obtained. Callback server will remain running for future refreshes.")
-        # Note: We keep server running so it's always ready for next refresh
+    def _handle_callback(self, code: Optional[str], error: Optional[str]) -> Tuple[int, str]:
+        """Handle the Upstox redirect; returns (HTTP status, response body)"""
+        if error:
+            logger.error(f"Authorization error: {error}")
+            return 400, _AUTH_ERROR_HTML.format(error=html.escape(error))
+
+        if code:
+            logger.info(f"Received authorization code: {code[:20]}...")
+
+            # Exchange code for token
+            success = self.exchange_code_for_token(code)
+
+            if success:
+                # Keep the server running so it's always ready for the next refresh
+                return 200, _AUTH_SUCCESS_HTML
+
+            return 500, _TOKEN_EXCHANGE_FAILED_HTML
+
+        return 400, "No authorization code received"
 
     def get_token(self) -> Optional[str]:
         """Get current valid access token"""
@@ -238,14 +315,12 @@ class TokenManager:
         """
         logger.info(f"Waiting for authorization (timeout: {timeout}s)...")
 
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            if self.is_token_valid():
-                logger.info("✅ Authorization complete!")
-                return True
+        # Clear before checking, so a token arriving in between still sets the event
+        self._token_event.clear()
 
-            time.sleep(5)  # Check every 5 seconds
+        if self.is_token_valid() or (self._token_event.wait(timeout) and self.is_token_valid()):
+            logger.info("✅ Authorization complete!")
+            return True
 
         logger.warning("⚠️ Authorization timeout")
         return False
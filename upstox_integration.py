@@ -4,11 +4,12 @@ This ensures all Upstox API calls use the latest valid token automatically
 """
 
 import logging
+import threading
 from typing import Optional
 
 from token_manager import get_token_manager
 from upstox_operator import UpstoxOperator
-from upstox_technical import UpstoxTechnicalClient
+from upstox_technical import UpstoxTechnicalClient, shared_session
 import config
 
 logger = logging.getLogger(__name__)
@@ -28,7 +29,14 @@ class UpstoxIntegration:
 
         # Initialize clients (they'll get the token when needed)
         self._operator = None
+        self._operator_token = None
+        self._operator_lock = threading.Lock()
         self._technical = None
+        self._technical_lock = threading.Lock()
+
+        # Pooled session shared with DataLayer's clients, so every operator we
+        # hand out reuses open TCP/TLS connections instead of new handshakes
+        self._session = shared_session()
 
         logger.info("Upstox Integration initialized")
 
@@ -56,15 +64,20 @@ class UpstoxIntegration:
         if not token:
             return None
 
-        # Create new operator with current token
-        # (We create fresh each time to ensure latest token is used)
-        operator = UpstoxOperator(
-            access_token=token,
-            mode="live"
-        )
-
-        logger.debug("UpstoxOperator created with fresh token")
-        return operator
+        # Reuse the operator while the token is unchanged; the lock keeps
+        # concurrent dashboard/orchestrator threads from each building one
+        with self._operator_lock:
+            if self._operator is None or token != self._operator_token:
+                self._operator = UpstoxOperator(
+                    access_token=token,
+                    mode="live",
+                    session=self._session,
+                    tech=self.get_technical()
+                )
+                self._operator_token = token
+                logger.debug("UpstoxOperator created with fresh token")
+
+            return self._operator
 
     def get_technical(self) -> UpstoxTechnicalClient:
         """
@@ -72,7 +85,9 @@ class UpstoxIntegration:
         Technical client doesn't need auth for most operations
         """
         if not self._technical:
-            self._technical = UpstoxTechnicalClient()
+            with self._technical_lock:
+                if not self._technical:
+                    self._technical = UpstoxTechnicalClient(session=self._session)
 
         return self._technical
 
@@ -86,6 +101,7 @@ class UpstoxIntegration:
 
 # Singleton instance
 _upstox_integration = None
+_upstox_integration_lock = threading.Lock()
 
 
 def get_upstox_integration() -> UpstoxIntegration:
@@ -93,7 +109,9 @@ def get_upstox_integration() -> UpstoxIntegration:
     global _upstox_integration
 
     if _upstox_integration is None:
-        _upstox_integration = UpstoxIntegration()
+        with _upstox_integration_lock:
+            if _upstox_integration is None:
+                _upstox_integration = UpstoxIntegration()
 
     return _upstox_integration
 
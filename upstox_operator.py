@@ -38,7 +38,8 @@ CLI examples:
 
 from __future__ import annotations
 
-import os, json, time, logging
+import os, json, time, logging, threading
+from functools import wraps
 from typing import Any, Dict, Optional, Tuple, List
 from datetime import datetime, time as dtime
 from zoneinfo import ZoneInfo
@@ -89,6 +90,77 @@ def _round_to_tick(x: float) -> float:
     return round(round(float(x) / t) * t, 2)  # 2 decimals is okay for EQ
 
 
+# ---------- circuit breaker ----------
+class _CircuitBreaker:
+    """
+    CLOSED -> OPEN after `threshold` consecutive failures (transport, 429, 5xx); while OPEN,
+    calls are short-circuited. After the cool-down one probe is let through
+    (HALF_OPEN): success closes the breaker, failure re-opens it with the
+    cool-down doubled (capped at `max_cooldown`).
+    The probe is owned by the thread that was let through; results of requests
+    that started before the breaker opened do not change its state.
+    """
+
+    def __init__(self, threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 300.0) -> None:
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._fails = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._probe_owner: Optional[int] = None  # thread ident of the in-flight probe
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._fails < self.threshold:
+                return True
+            if time.monotonic() < self._open_until or self._probe_owner is not None:
+                return False
+            self._probe_owner = threading.get_ident()  # half-open: single trial request
+            return True
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            was_probe = self._probe_owner == threading.get_ident()
+            if was_probe:
+                self._probe_owner = None
+            elif self._fails >= self.threshold:
+                # Already open: only the probe decides whether it closes
+                return
+            if ok:
+                self._fails = 0
+                self._cooldown = self.base_cooldown
+                return
+            self._fails += 1
+            if was_probe:
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            if self._fails >= self.threshold:
+                self._open_until = time.monotonic() + self._cooldown
+                log.warning("Upstox circuit OPEN for %.0fs after %d failures", self._cooldown, self._fails)
+
+
+# Shared by all operator instances (get_operator may build a fresh one per call)
+_BREAKER = _CircuitBreaker()
+
+# Order states in which an order can no longer fill or be modified
+ORDER_FINAL_STATES = frozenset({"complete", "cancelled", "rejected"})
+
+
+def _guarded(fn):
+    """Route an HTTP helper through the shared circuit breaker."""
+    @wraps(fn)
+    def wrapper(self, path, *args, **kwargs):
+        if not _BREAKER.allow():
+            return 0, {"error": "circuit_open"}
+        st, data = fn(self, path, *args, **kwargs)
+        # Network errors (0), rate limiting (429) and 5xx count as failures;
+        # other 4xx are the caller's problem
+        _BREAKER.record(0 < st < 500 and st != 429)
+        return st, data
+    return wrapper
+
+
 class UpstoxOperator:
     """High-level trading operations for Upstox with mandatory SL."""
 
@@ -143,6 +215,7 @@ class UpstoxOperator:
             time.sleep(self._rate_gap - elapsed)
         self._last_req_ts = time.time()
 
+    @_guarded
     def _get(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: int = 30) -> Tuple[int, Any]:
         url = path if path.startswith("http") else f"{self.api_base}{path}"
         try:
@@ -183,6 +256,7 @@ class UpstoxOperator:
                 log.error("GET %s failed (insecure): %s", url, e2)
                 return 0, {"error": str(e2)}
 
+    @_guarded
     def _post(self, path: str, payload: Dict[str, Any], timeout: int = 30) -> Tuple[int, Any]:
         url = path if path.startswith("http") else f"{self.api_base}{path}"
         try:
@@ -223,6 +297,7 @@ class UpstoxOperator:
                 log.error("POST %s failed (insecure): %s", url, e2)
                 return 0, {"error": str(e2)}
 
+    @_guarded
     def _delete(self, path: str, timeout: int = 30) -> Tuple[int, Any]:
         url = path if path.startswith("http") else f"{self.api_base}{path}"
         try:
@@ -405,6 +480,37 @@ class UpstoxOperator:
             time.sleep(poll_seconds)
         return {"ok": False, "status": self.market_session_status(), "error": "timeout"}
 
+    # --- Quotes ---
+    def get_ltp_batch(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Last traded price for many symbols in ONE /v2/market-quote/ltp call.
+        Returns {symbol: ltp}; symbols without a quote are omitted.
+        """
+        keys: Dict[str, str] = {}
+        for s in symbols:
+            try:
+                keys[s] = self._resolve(s)["instrument_key"]
+            except Exception as e:
+                log.warning("LTP batch: cannot resolve %s: %s", s, e)
+        if not keys:
+            return {}
+
+        st, data = self._get("/v2/market-quote/ltp", {"instrument_key": ",".join(set(keys.values()))})
+        if st != 200 or not isinstance(data, dict):
+            log.warning("LTP batch failed (http=%s)", st)
+            return {}
+
+        quotes = data.get("data") or {}
+        # Response is keyed by "EXCHANGE:SYMBOL"; map back via instrument_token too
+        by_token = {(q or {}).get("instrument_token"): q for q in quotes.values()}
+        out: Dict[str, float] = {}
+        for s, ik in keys.items():
+            q = quotes.get(ik) or quotes.get(ik.replace("|", ":")) or by_token.get(ik)
+            lp = (q or {}).get("last_price")
+            if lp is not None:
+                out[s] = float(lp)
+        return out
+
     # --- Funds & portfolio ---
     def get_funds(self, segment: str = "SEC") -> Dict[str, Any]:
         st, data = self._get("/v2/user/get-funds-and-margin", {"segment": segment})
@@ -427,7 +533,8 @@ class UpstoxOperator:
     def get_positions(self, include_closed: bool = False) -> Dict[str, Any]:
         st, data = self._get("/v2/portfolio/short-term-positions")
         if st != 200 or not isinstance(data, dict):
-            return {"error": "failed_to_fetch", "status": st, "response": data}
+            err = "circuit_open" if isinstance(data, dict) and data.get("error") == "circuit_open" else "failed_to_fetch"
+            return {"error": err, "status": st, "response": data}
         pos = data.get("data") or []
         if not include_closed:
             pos = [p for p in pos if int(p.get("quantity", 0) or 0) != 0]
@@ -804,7 +911,18 @@ class UpstoxOperator:
                 return {"error": "instrument_key_or_symbol_required"}
             instrument_key = self._resolve(symbol)["instrument_key"]
 
-        pos = self.get_positions().get("positions") or []
+        positions = self.get_positions()
+        if positions.get("status") != "ok":
+            # An unknown position is not a flat one - never report success on a failed fetch
+            return {
+                "status": "error",
+                "message": "circuit_open" if positions.get("error") == "circuit_open" else "positions_unavailable",
+                "instrument_key": instrument_key,
+                "symbol": symbol,
+                "response": positions,
+            }
+
+        pos = positions.get("positions") or []
         position = None
         for p in pos:
             if p.get("instrument_token") == instrument_key:
@@ -874,6 +992,48 @@ class UpstoxOperator:
             "timestamp": datetime.now(tz=self.IST).isoformat(),
         }
 
+    def get_order(self, order_id: str) -> Dict[str, Any]:
+        """Latest details of one order (status, filled quantity, average price)."""
+        st, data = self._get("/v2/order/details", {"order_id": order_id})
+        if st != 200 or not isinstance(data, dict):
+            return {"error": "failed_to_fetch", "status": st, "response": data}
+        return {"status": "ok", "order": data.get("data") or {}}
+
+    def cancel_order(self, order_id: str, live: bool = False) -> Dict[str, Any]:
+        """
+        Cancel a pending order. An order that already reached a final state
+        (filled / cancelled / rejected) counts as done - it can no longer fill.
+        """
+        blk = self._live_guard(live)
+        if blk:
+            return blk
+
+        if not live:
+            return {
+                "live": False,
+                "dry_run": True,
+                "order_id": order_id,
+                "note": "Set live=True to cancel the order",
+            }
+
+        st, data = self._delete(f"/v2/order/cancel?order_id={order_id}")
+        if st == 200 and isinstance(data, dict):
+            return {"status": "ok", "order_id": order_id, "message": "cancelled"}
+
+        # Cancel is refused for orders that are no longer working; confirm that's why
+        details = self.get_order(order_id)
+        order_status = (details.get("order") or {}).get("status", "").lower()
+        if order_status in ORDER_FINAL_STATES:
+            return {"status": "ok", "order_id": order_id, "message": f"already_{order_status}"}
+
+        return {
+            "status": "error",
+            "message": "cancel_failed",
+            "order_id": order_id,
+            "http_status": st,
+            "response": data,
+        }
+
 
 # ---------------- CLI (minimal; optional) ----------------
 def _cli():
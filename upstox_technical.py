@@ -32,7 +32,7 @@ Environment (optional):
 """
 
 from __future__ import annotations
-import os, io, json, time, gzip, logging, pathlib, datetime as dt, csv, re
+import os, io, json, time, gzip, logging, pathlib, datetime as dt, csv, re, threading
 from typing import Any, Dict, List, Optional, Tuple, Iterable, Set
 from zoneinfo import ZoneInfo
 
@@ -48,6 +48,8 @@ except Exception:
 # ---------- requests ----------
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     _HAS_REQ = True
 except Exception:
     _HAS_REQ = False
@@ -397,16 +399,40 @@ class TA:
         return (pv/v) if v>0 else None
 
 
+# ---------- shared HTTP session ----------
+# Keep-alive connections per host: the 8-thread OHLCV/news scan pools plus dashboard/orchestrator calls
+HTTP_POOL_SIZE = 16
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def shared_session() -> "requests.Session":
+    """Process-wide pooled session, so every client reuses open TCP/TLS connections."""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                s = requests.Session()
+                # Transient gateway errors are retried on idempotent methods only (never order POSTs);
+                # the final response is returned as-is so callers still see the status code
+                retries = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_SIZE, max_retries=retries)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _shared_session = s
+    return _shared_session
+
+
 # ---------- client ----------
 class UpstoxTechnicalClient:
     IST = ZoneInfo(os.environ.get("TZ","Asia/Kolkata"))
 
-    def __init__(self, access_token: Optional[str]=None, api_base: Optional[str]=None, verify_tls: bool=True):
+    def __init__(self, access_token: Optional[str]=None, api_base: Optional[str]=None, verify_tls: bool=True,
+                 session: Optional["requests.Session"]=None):
         if not _HAS_REQ: raise RuntimeError("requests is required")
         self.api_base = (api_base or os.environ.get("UPSTOX_API_BASE","https://api.upstox.com")).rstrip("/")
         self.access_token = (access_token or os.environ.get("UPSTOX_ACCESS_TOKEN") or "").strip()
         self.verify_tls = verify_tls
-        self.sess = requests.Session()
+        self.sess = session or requests.Session()
         self.log = _mk_logger("upstox_tech")
 
         # instruments
@@ -418,6 +444,9 @@ class UpstoxTechnicalClient:
         # web fallback
         self.web = WebISINFallback(self.log, session=self.sess, verify_tls=verify_tls)
 
+        # resolved rows, valid as long as the instrument index loaded above
+        self._resolved: Dict[str, Dict[str,Any]] = {}
+
     # http
     def _headers(self) -> Dict[str,str]:
         h = {"Accept":"application/json"}
@@ -449,14 +478,17 @@ class UpstoxTechnicalClient:
 
     # resolve
     def resolve(self, query: str) -> Dict[str,Any]:
-        row = self.cache.resolve(query)
+        row = self._resolved.get(query)
         if row: return row
-        # web fallback → ISIN → validate in cache
-        isin = self.web.find_isin(query)
-        if isin:
-            row2 = self.cache.resolve(isin)
-            if row2: return row2
-        raise RuntimeError(f"Unable to resolve instrument for: {query}")
+        row = self.cache.resolve(query)
+        if not row:
+            # web fallback → ISIN → validate in cache
+            isin = self.web.find_isin(query)
+            row = self.cache.resolve(isin) if isin else None
+            if not row:
+                raise RuntimeError(f"Unable to resolve instrument for: {query}")
+        self._resolved[query] = row
+        return row
 
     # candles
     @staticmethod
@@ -6,18 +6,10 @@ Tests all components before running
 
 import sys
 import os
+import importlib.util
+import py_compile
 
-print("=" * 60)
-print("TradeGo System Verification")
-print("=" * 60)
-
-# Test 1: Check Python version
-print("\n1. Python Version Check")
-print(f"   ✅ Python {sys.version.split()[0]}")
-
-# Test 2: Check required files exist
-print("\n2. File Structure Check")
-required_files = [
+REQUIRED_FILES = frozenset({
     'dashboard.py',
     'orchestrator.py',
     'settings_manager.py',
@@ -28,13 +20,34 @@ required_files = [
     'risk_manager.py',
     'upstox_integration.py',
     'logging_config.py'
-]
+})
 
-for file in required_files:
-    if os.path.exists(file):
-        print(f"   ✅ {file}")
-    else:
+print("=" * 60)
+print("TradeGo System Verification")
+print("=" * 60)
+
+# Test 1: Check Python version
+print("\n1. Python Version Check")
+print(f"   ✅ Python {sys.version.split()[0]}")
+
+# Test 2: Check required files exist
+print("\n2. File Structure Check")
+
+# One directory listing per folder instead of a stat() per file
+present = set()
+for folder in {os.path.dirname(f) for f in REQUIRED_FILES}:
+    try:
+        with os.scandir(folder or '.') as entries:
+            present.update(f"{folder}/{e.name}" if folder else e.name for e in entries)
+    except OSError:
+        pass
+
+missing_files = REQUIRED_FILES - present
+for file in sorted(REQUIRED_FILES):
+    if file in missing_files:
         print(f"   ❌ {file} - MISSING!")
+    else:
+        print(f"   ✅ {file}")
 
 # Test 3: Check data directory
 print("\n3. Data Directory Check")
@@ -51,8 +64,7 @@ else:
 # Test 4: Import dependencies
 print("\n4. Dependencies Check")
 required_modules = {
-    'flask': 'Flask',
-    'schedule': 'schedule',
+    'flask': 'flask',
     'psutil': 'psutil',
     'pandas': 'pandas',
     'requests': 'requests',
@@ -61,10 +73,10 @@ required_modules = {
 
 missing = []
 for pip_name, import_name in required_modules.items():
-    try:
-        __import__(import_name)
+    # find_spec only locates the package; importing would run flask/pandas startup code
+    if importlib.util.find_spec(import_name) is not None:
         print(f"   ✅ {pip_name}")
-    except ImportError:
+    else:
         print(f"   ❌ {pip_name} - MISSING! Run: pip install {pip_name}")
         missing.append(pip_name)
 
@@ -86,17 +98,17 @@ except Exception as e:
 # Test 6: Orchestrator
 print("\n6. Orchestrator Check")
 try:
-    # Just import, don't initialize (to avoid dependencies)
-    import orchestrator
-    print(f"   ✅ Orchestrator module loads")
+    # Compile only - importing would start the token manager, instrument cache and DB
+    py_compile.compile('orchestrator.py', doraise=True)
+    print(f"   ✅ Orchestrator module compiles")
 except Exception as e:
     print(f"   ❌ Orchestrator error: {e}")
 
 # Test 7: Dashboard
 print("\n7. Dashboard Check")
 try:
-    import dashboard
-    print(f"   ✅ Dashboard module loads")
+    py_compile.compile('dashboard.py', doraise=True)
+    print(f"   ✅ Dashboard module compiles")
 except Exception as e:
     print(f"   ❌ Dashboard error: {e}")
 